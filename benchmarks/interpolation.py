@@ -0,0 +1,47 @@
+"""
+Time the interpolation of generated .env files against environments of
+different sizes.
+
+Usage: python benchmarks/interpolation.py [KEYS ...]
+
+Files have 500, 2,000 and 8,000 keys by default, a third of whose values
+refer to earlier keys and to environment variables, and are interpolated
+with 0, 300 and 3,000 extra environment variables. Interpolation used to take
+time proportional to keys × (environment + keys), and now to keys +
+environment.
+"""
+
+import os
+import sys
+import time
+from unittest import mock
+
+from dotenv.main import resolve_variables
+
+ENVIRONMENT_SIZES = [0, 300, 3000]
+
+
+def make_values(keys: int) -> list:
+    return [
+        (f"KEY_{index}", f"${{KEY_{index - 1}}}/${{HOME:-home}}")
+        if index % 3 == 2
+        else (f"KEY_{index}", f"value-{index}")
+        for index in range(keys)
+    ]
+
+
+def main() -> None:
+    sizes = [int(arg) for arg in sys.argv[1:]] or [500, 2000, 8000]
+    for keys in sizes:
+        values = make_values(keys)
+        for environment in ENVIRONMENT_SIZES:
+            extra = {f"ENV_{index}": "x" * 20 for index in range(environment)}
+            with mock.patch.dict(os.environ, extra):
+                start = time.perf_counter()
+                resolve_variables(values, override=True)
+                elapsed = time.perf_counter() - start
+            print(f"{keys:>6} keys {environment:>5} variables {elapsed:8.3f} s")
+
+
+if __name__ == "__main__":
+    main()
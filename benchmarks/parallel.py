@@ -0,0 +1,54 @@
+"""
+Time the loading of a large generated .env file serially and in parallel.
+
+Usage: python benchmarks/parallel.py [LINES [WORKERS ...]]
+
+The file has 500,000 lines by default and is loaded with `workers` set to
+2, 4 and 8 by default. Interpolation is disabled so that only parsing is
+timed. Parallel parsing can only beat the serial parser with several CPUs.
+
+It has only been run on a single CPU so far, where the process pool makes
+loading about 30% slower than the serial parser. No multi-core measurement
+has been made yet; please add one here.
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from dotenv import dotenv_values
+
+
+def make_content(lines: int) -> str:
+    return "".join(
+        f"KEY_{index}=value-{index} # comment\n"
+        if index % 3
+        else f'KEY_{index}="multiline\\nvalue {index}"\n'
+        for index in range(lines)
+    )
+
+
+def main() -> None:
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    counts = [int(arg) for arg in sys.argv[2:]] or [2, 4, 8]
+    print(f"{os.cpu_count()} CPUs, {lines} lines")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, ".env")
+        with open(path, "w") as file:
+            file.write(make_content(lines))
+
+        expected = None
+        for workers in [None, *counts]:
+            start = time.perf_counter()
+            values = dotenv_values(path, interpolate=False, workers=workers)
+            elapsed = time.perf_counter() - start
+            if expected is None:
+                expected = values
+            assert values == expected
+            print(f"workers={str(workers):<5} {elapsed:8.3f} s")
+
+
+if __name__ == "__main__":
+    main()
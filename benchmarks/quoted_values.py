@@ -0,0 +1,44 @@
+"""
+Time the parsing of .env files with one huge quoted value.
+
+Usage: python benchmarks/quoted_values.py [SIZE_MB ...]
+
+The sizes default to 1, 10 and 100 MB. Each value is parsed as plain text
+(e.g. base64) and as JSON, whose many escaped quotes are the worst case for
+finding the closing quote.
+"""
+
+import sys
+import time
+
+from dotenv.parser import parse_string
+
+MB = 1024 * 1024
+
+
+def make_values(size: int) -> dict:
+    plain = "QUJDREVGR0hJSktMTU5PUFFSU1RVVldYWVo=\n"
+    json = '{\\"key\\": \\"value\\", \\"list\\": [1, 2, 3]}, '
+    return {
+        "single-quoted base64": "KEY='{}'\n".format(plain * (size // len(plain))),
+        "double-quoted base64": 'KEY="{}"\n'.format(plain * (size // len(plain))),
+        "double-quoted JSON": 'KEY="{}"\n'.format(json * (size // len(json))),
+    }
+
+
+def main() -> None:
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1, 10, 100]
+    for size in sizes:
+        for name, content in make_values(size * MB).items():
+            start = time.perf_counter()
+            (binding,) = parse_string(content)
+            elapsed = time.perf_counter() - start
+            assert binding.key == "KEY"
+            print(
+                f"{size:>4} MB {name:<22} {elapsed:8.3f} s"
+                f" {len(content) / MB / elapsed:8.1f} MB/s"
+            )
+
+
+if __name__ == "__main__":
+    main()
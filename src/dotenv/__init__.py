@@ -1,6 +1,18 @@
 from typing import Any, Optional
 
-from .main import dotenv_values, find_dotenv, get_key, load_dotenv, set_key, unset_key
+from .cache import cache_clear, cache_info
+from .main import (
+    dotenv_values,
+    find_dotenv,
+    fingerprint,
+    get_key,
+    get_keys,
+    list_keys,
+    load_dotenv,
+    parse_diagnostics,
+    set_key,
+    unset_key,
+)
 
 
 def load_ipython_extension(ipython: Any) -> None:
@@ -40,12 +52,18 @@ def get_cli_string(
 
 
 __all__ = [
+    "cache_clear",
+    "cache_info",
     "get_cli_string",
     "load_dotenv",
     "dotenv_values",
     "get_key",
+    "get_keys",
+    "list_keys",
+    "parse_diagnostics",
     "set_key",
     "unset_key",
     "find_dotenv",
+    "fingerprint",
     "load_ipython_extension",
 ]
@@ -0,0 +1,197 @@
+"""
+Caches of the parsed content of .env files.
+
+`load_dotenv` and `dotenv_values` use the process-wide cache when called with
+`cache=True`. The key (key, value) pairs of a file are kept, before
+interpolation, under the identity and state of the file given by `os.stat`:
+loading a file which hasn't changed since it was cached costs one `stat`
+call. The least recently used entries are dropped beyond `maxsize`.
+
+With `disk_cache=True`, the pairs are also stored on disk, see
+`load_values`, so that short-lived processes don't parse the file again.
+"""
+
+import hashlib
+import marshal
+import os
+import stat
+import sys
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Callable, NamedTuple, Optional, Tuple, Union
+
+StrPath = Union[str, "os.PathLike[str]"]
+
+Values = Tuple[Tuple[str, Optional[str]], ...]
+Key = Tuple[int, int, int, int, Optional[str], str]
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class ParseCache:
+    """
+    Thread-safe LRU mapping of file states to their parsed values.
+    """
+
+    def __init__(self, maxsize: int = 32) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Key, Values]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(path: StrPath, encoding: Optional[str], dialect: str) -> Optional[Key]:
+        """
+        Return the key of the regular file at `path` parsed with `encoding` and
+        `dialect`, or `None` if it isn't a regular file.
+
+        The device and inode identify the file whatever the path it is reached
+        through, and its size and modification time tell whether it changed.
+        """
+        try:
+            path_stat = os.stat(path)
+        except (OSError, ValueError):
+            return None
+        if not stat.S_ISREG(path_stat.st_mode):
+            return None
+        return (
+            path_stat.st_dev,
+            path_stat.st_ino,
+            path_stat.st_size,
+            path_stat.st_mtime_ns,
+            encoding,
+            dialect,
+        )
+
+    def get(self, key: Key) -> Optional[Values]:
+        with self._lock:
+            values = self._entries.get(key)
+            if values is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._entries.move_to_end(key)
+            return values
+
+    def put(self, key: Key, values: Values) -> None:
+        with self._lock:
+            self._entries[key] = values
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def info(self) -> CacheInfo:
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.maxsize, len(self._entries))
+
+
+parse_cache = ParseCache()
+
+
+def cache_clear() -> None:
+    """Empty the parse cache and reset its counters."""
+    parse_cache.clear()
+
+
+def cache_info() -> CacheInfo:
+    """Return the hits, misses, maximum and current size of the parse cache."""
+    return parse_cache.info()
+
+
+# Bumped when the format of the entries of the on-disk cache changes.
+_DISK_VERSION = 1
+
+
+def cache_dir() -> str:
+    """
+    Return the directory of the on-disk cache: `$PYTHON_DOTENV_CACHE_DIR` if set,
+    else `python-dotenv` in `$XDG_CACHE_HOME` or `~/.cache`.
+    """
+    directory = os.environ.get("PYTHON_DOTENV_CACHE_DIR")
+    if directory:
+        return directory
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(base, "python-dotenv")
+
+
+def _entry_path(path: StrPath, encoding: Optional[str], dialect: str) -> str:
+    source = "\0".join([os.path.realpath(path), str(encoding), dialect])
+    name = hashlib.blake2b(os.fsencode(source), digest_size=16).hexdigest()
+    return os.path.join(cache_dir(), name)
+
+
+def _read_entry(entry_path: str) -> Optional[tuple]:
+    try:
+        # `marshal.load` would read the file object by object.
+        with open(entry_path, "rb") as file:
+            entry = marshal.loads(file.read())
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if not isinstance(entry, tuple) or len(entry) != 4:
+        return None
+    return entry
+
+
+def _write_entry(entry_path: str, entry: tuple) -> None:
+    directory = os.path.dirname(entry_path)
+    # The values may be secrets, so only the user can read them.
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    with tempfile.NamedTemporaryFile(
+        mode="wb", delete=False, prefix=".tmp_", dir=directory
+    ) as dest:
+        dest.write(marshal.dumps(entry))
+    try:
+        os.replace(dest.name, entry_path)
+    except BaseException:
+        os.unlink(dest.name)
+        raise
+
+
+def load_values(
+    path: StrPath,
+    encoding: Optional[str],
+    dialect: str,
+    parse: Callable[[bytes], Values],
+) -> Values:
+    """
+    Return the parsed values of the file at `path`, from the on-disk cache if
+    it has an entry for the file, `encoding` and `dialect` which is still valid.
+
+    Otherwise, the content of the file is parsed with `parse` and the values
+    are stored, with the size, modification time and inode of the file and a
+    hash of its content, in a file of `cache_dir()` which replaces the former
+    entry atomically. An entry is valid if all of these match the file. Errors
+    while reading or writing entries are ignored.
+    """
+    with open(path, "rb") as file:
+        path_stat = os.fstat(file.fileno())
+        data = file.read()
+    stamp = (path_stat.st_size, path_stat.st_mtime_ns, path_stat.st_ino)
+    digest = hashlib.blake2b(data).digest()
+    version = (_DISK_VERSION, sys.version_info[:2])
+
+    entry_path = _entry_path(path, encoding, dialect)
+    entry = _read_entry(entry_path)
+    if entry is not None and entry[:3] == (version, stamp, digest):
+        return entry[3]
+
+    values = parse(data)
+    try:
+        _write_entry(entry_path, (version, stamp, digest, values))
+    except OSError:
+        pass
+    return values
@@ -17,7 +17,9 @@ except ImportError:
     )
     sys.exit(1)
 
-from .main import dotenv_values, set_key, unset_key
+from .freeze import freeze
+from .index import build_index, lookup
+from .main import dotenv_values, fingerprint, set_key, unset_key
 from .version import __version__
 
 
@@ -109,6 +111,26 @@ def list_values(ctx: click.Context, output_format: str) -> None:
                 click.echo(f"{prefix}{k}={v}")
 
 
+@cli.command(name="hash")
+@click.pass_context
+@click.option(
+    "--interpolate/--no-interpolate",
+    default=False,
+    help="Hash the values after interpolating them with the environment.",
+)
+def hash_values(ctx: click.Context, interpolate: bool) -> None:
+    """
+    Display a digest of the stored key/value pairs.
+
+    Unlike a hash of the file, it doesn't change with comments, spacing or
+    quoting, so it can be used as a cache key for the configuration.
+    """
+    file = ctx.obj["FILE"]
+
+    with stream_file(file) as stream:
+        click.echo(fingerprint(stream=stream, interpolate=interpolate))
+
+
 @cli.command(name="set")
 @click.pass_context
 @click.argument("key", required=True)
@@ -139,15 +161,63 @@ def get(ctx: click.Context, key: Any) -> None:
     file = ctx.obj["FILE"]
 
     with stream_file(file) as stream:
-        values = dotenv_values(stream=stream)
+        result = lookup(file, key, encoding=None)
+        if result is None:
+            stored_value = dotenv_values(stream=stream, keys=[key]).get(key)
+        else:
+            _, stored_value = result
 
-    stored_value = values.get(key)
     if stored_value:
         click.echo(stored_value)
     else:
         sys.exit(1)
 
 
+@cli.command(name="index")
+@click.pass_context
+def index_keys(ctx: click.Context) -> None:
+    """
+    Index the keys of the .env file, to speed up `get`.
+
+    The index is stored next to the file, with an `.idx` suffix, and kept up to
+    date by `set` and `unset`.
+    """
+    file = ctx.obj["FILE"]
+    try:
+        path = build_index(file, encoding=None)
+    except OSError as exc:
+        print(f"Error opening env file: {exc}", file=sys.stderr)
+        sys.exit(2)
+    except ValueError as exc:
+        print(f"Error indexing env file: {exc}", file=sys.stderr)
+        sys.exit(1)
+    click.echo(f"Indexed {file} in {path}")
+
+
+@cli.command(name="freeze")
+@click.pass_context
+@click.option(
+    "--interpolate/--no-interpolate",
+    default=True,
+    help="Interpolate the values now rather than when the module is loaded.",
+)
+@click.argument("module_path", type=click.Path(dir_okay=False))
+def freeze_module(ctx: click.Context, interpolate: bool, module_path: str) -> None:
+    """
+    Compile the .env file into a Python module.
+
+    `load_dotenv(frozen=...)` and `dotenv_values(frozen=...)` load the module,
+    given as a module or its name, without reading or parsing the .env file.
+    """
+    file = ctx.obj["FILE"]
+    try:
+        values = freeze(file, module_path, interpolate, encoding=None)
+    except OSError as exc:
+        print(f"Error freezing env file: {exc}", file=sys.stderr)
+        sys.exit(2)
+    click.echo(f"Froze {len(values)} variables from {file} in {module_path}")
+
+
 @cli.command()
 @click.pass_context
 @click.argument("key", required=True)
@@ -180,8 +250,15 @@ def unset(ctx: click.Context, key: Any) -> None:
     default=True,
     help="Override variables from the environment file with those from the .env file.",
 )
+@click.option(
+    "--cache/--no-cache",
+    default=False,
+    help="Reuse the parsed .env file from the on-disk cache if it is unchanged.",
+)
 @click.argument("commandline", nargs=-1, type=click.UNPROCESSED)
-def run(ctx: click.Context, override: bool, commandline: tuple[str, ...]) -> None:
+def run(
+    ctx: click.Context, override: bool, cache: bool, commandline: tuple[str, ...]
+) -> None:
     """Run command with environment variables present."""
     file = ctx.obj["FILE"]
     if not os.path.isfile(file):
@@ -190,7 +267,7 @@ def run(ctx: click.Context, override: bool, commandline: tuple[str, ...]) -> Non
         )
     dotenv_as_dict = {
         k: v
-        for (k, v) in dotenv_values(file).items()
+        for (k, v) in dotenv_values(file, disk_cache=cache).items()
         if v is not None and (override or k not in os.environ)
     }
 
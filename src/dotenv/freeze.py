@@ -0,0 +1,87 @@
+"""
+Compile .env files into Python modules.
+
+A frozen module defines `VALUES`, a dict of the variables of the file, and
+`INTERPOLATED`, whether the values were interpolated when it was generated.
+`load_dotenv(frozen=module)` and `dotenv_values(frozen=module)` then use it
+without reading or parsing anything. Being a regular module, it is compiled
+to bytecode and cached by Python, and can be imported from a zip file.
+"""
+
+import importlib
+import os
+import tempfile
+from types import ModuleType
+from typing import Dict, Mapping, Optional, Union
+
+StrPath = Union[str, "os.PathLike[str]"]
+
+FORMAT = 1
+
+
+def render_module(
+    values: Mapping[str, Optional[str]],
+    interpolated: bool,
+    source: Optional[str] = None,
+) -> str:
+    """Return the source code of a frozen module defining `values`."""
+    lines = [
+        f"# Generated by `dotenv freeze` from {source}. Do not edit."
+        if source
+        else "# Generated by `dotenv freeze`. Do not edit.",
+        f"FORMAT = {FORMAT}",
+        f"INTERPOLATED = {interpolated!r}",
+        "VALUES = {",
+        *(f"    {key!r}: {value!r}," for key, value in values.items()),
+        "}",
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def freeze(
+    dotenv_path: StrPath,
+    module_path: StrPath,
+    interpolate: bool = True,
+    encoding: Optional[str] = "utf-8",
+) -> Dict[str, Optional[str]]:
+    """
+    Parse the .env file at `dotenv_path` and write its values to a frozen
+    module at `module_path`, atomically. Returns the values.
+
+    With `interpolate`, values are interpolated now, against the current
+    environment. Otherwise, they are interpolated when the module is loaded.
+    """
+    from .main import dotenv_values
+
+    with open(dotenv_path, encoding=encoding) as stream:
+        values = dotenv_values(stream=stream, interpolate=interpolate)
+    source = render_module(values, interpolate, os.path.basename(dotenv_path))
+
+    with tempfile.NamedTemporaryFile(
+        mode="w",
+        encoding="utf-8",
+        delete=False,
+        prefix=".tmp_",
+        suffix=".py",
+        dir=os.path.dirname(os.path.abspath(module_path)),
+    ) as dest:
+        dest.write(source)
+    try:
+        os.replace(dest.name, module_path)
+    except BaseException:
+        os.unlink(dest.name)
+        raise
+    return values
+
+
+def load_frozen(module: Union[ModuleType, str]) -> ModuleType:
+    """
+    Return the frozen module `module`, importing it if it is a name.
+
+    Raises `ValueError` if it isn't a frozen module this version can read.
+    """
+    if isinstance(module, str):
+        module = importlib.import_module(module)
+    if getattr(module, "FORMAT", None) != FORMAT:
+        raise ValueError(f"Not a frozen .env module: {module.__name__}")
+    return module
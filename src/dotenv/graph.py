@@ -0,0 +1,171 @@
+"""
+Interpolation of .env values in dependency order.
+
+By default, values are interpolated from top to bottom, so a value can only
+refer to the variables defined before it. `VariableGraph` instead resolves
+each key after the keys its value refers to, wherever they are defined.
+"""
+
+import os
+from collections import ChainMap
+from graphlib import CycleError, TopologicalSorter
+from typing import (
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+from .variables import Template, compile_template
+
+
+class CyclicReferenceError(ValueError):
+    """Values which refer to each other, directly or not."""
+
+    def __init__(self, keys: Sequence[str]) -> None:
+        super().__init__(f"Cyclic references between {', '.join(keys)}")
+        self.keys: Tuple[str, ...] = tuple(keys)
+
+
+class VariableGraph:
+    """
+    Graph of the references between the keys of a .env file.
+
+    Each key is defined by its last definition in `values`, and refers to the
+    keys of the file named in the `${name}` expressions of its value. A value
+    which refers to its own key refers to the environment, as in
+    `PATH=${PATH}:/usr/local/bin`. The graph is built in time linear in the
+    size of the values, and `references` and `dependents` are lookups.
+    """
+
+    def __init__(self, values: Iterable[Tuple[str, Optional[str]]]) -> None:
+        self.values: Dict[str, Optional[str]] = dict(values)
+        self._templates: Dict[str, Template] = {}
+        self._references: Dict[str, FrozenSet[str]] = {}
+        self._dependents: Dict[str, Set[str]] = {}
+        self._readers: Dict[str, Set[str]] = {}
+
+        for key, value in self.values.items():
+            if value is None or "${" not in value:
+                continue
+            template = compile_template(value)
+            for name in template.names:
+                self._readers.setdefault(name, set()).add(key)
+            names = frozenset(
+                name for name in template.names if name != key and name in self.values
+            )
+            self._templates[key] = template
+            if names:
+                self._references[key] = names
+                for name in names:
+                    self._dependents.setdefault(name, set()).add(key)
+
+    def references(self, key: str) -> FrozenSet[str]:
+        """Return the keys of the file which the value of `key` refers to."""
+        return self._references.get(key, frozenset())
+
+    def dependents(self, key: str) -> FrozenSet[str]:
+        """Return the keys whose values refer to `key`."""
+        return frozenset(self._dependents.get(key, ()))
+
+    def readers(self, name: str) -> FrozenSet[str]:
+        """
+        Return the keys whose values refer to the variable `name`, whether it
+        is defined in the file or only in the environment.
+        """
+        return frozenset(self._readers.get(name, ()))
+
+    def changed(self, other: "VariableGraph") -> Set[str]:
+        """
+        Return the keys whose values may resolve differently than in the graph
+        `other` of a former version of the file, the environment being equal:
+        those defined differently, and those depending on them.
+        """
+        changed = {
+            key
+            for key, value in self.values.items()
+            if key not in other.values or other.values[key] != value
+        }
+        # Keys which refer to added or removed keys change even if their
+        # definitions don't, since their references do.
+        for key in self.values.keys() ^ other.values.keys():
+            changed.update(self.readers(key))
+        return self.affected(changed)
+
+    def affected(self, keys: Iterable[str]) -> Set[str]:
+        """Return `keys` and the keys which depend on them, directly or not."""
+        affected: Set[str] = set()
+        pending = list(keys)
+        while pending:
+            key = pending.pop()
+            if key not in affected:
+                affected.add(key)
+                pending.extend(self._dependents.get(key, ()))
+        return affected
+
+    def closure(self, keys: Iterable[str]) -> Set[str]:
+        """Return `keys` and the keys they refer to, directly or not."""
+        needed: Set[str] = set()
+        pending = [key for key in keys if key in self.values]
+        while pending:
+            key = pending.pop()
+            if key not in needed:
+                needed.add(key)
+                pending.extend(self.references(key))
+        return needed
+
+    def order(self, keys: Optional[Iterable[str]] = None) -> List[str]:
+        """
+        Return `keys`, by default all of them, and the keys they refer to, each
+        after the keys it refers to.
+
+        Raises `CyclicReferenceError` with the keys of a cycle if there is one.
+        """
+        needed = self.values.keys() if keys is None else self.closure(keys)
+        sorter = TopologicalSorter({key: self.references(key) for key in needed})
+        try:
+            return list(sorter.static_order())
+        except CycleError as error:
+            # The cycle is given as a path which ends with its first key.
+            raise CyclicReferenceError(error.args[1][:-1]) from None
+
+    def resolve(
+        self,
+        override: bool,
+        keys: Optional[Iterable[str]] = None,
+        known: Optional[Mapping[str, Optional[str]]] = None,
+        environ: Optional[Mapping[str, str]] = None,
+    ) -> Dict[str, Optional[str]]:
+        """
+        Interpolate the values of `keys`, by default all of them, and of the
+        keys they refer to, in dependency order.
+
+        With `override`, the values of the file take precedence over `environ`,
+        by default `os.environ`. The values in `known` are used as they are
+        instead of being interpolated again. The result is in the order in
+        which the keys are first defined.
+        """
+        resolved: Dict[str, Optional[str]] = {}
+        snapshot: Dict[str, Optional[str]] = dict(
+            os.environ if environ is None else environ
+        )
+        env: Mapping[str, Optional[str]] = (
+            ChainMap(resolved, snapshot) if override else ChainMap(snapshot, resolved)
+        )
+
+        for key in self.order(keys):
+            template = self._templates.get(key)
+            if known is not None and key in known:
+                resolved[key] = known[key]
+            elif template is None:
+                resolved[key] = self.values[key]
+            else:
+                # A key isn't resolved yet when its own value refers to it.
+                resolved[key] = template.substitute(env)
+
+        return {key: resolved[key] for key in self.values if key in resolved}
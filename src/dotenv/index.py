@@ -0,0 +1,223 @@
+"""
+Sidecar index of the keys of a .env file.
+
+The index of `path` is stored in `path + ".idx"`. Its first line is a JSON
+header with the size, modification time and inode of the .env file when it
+was indexed, and the encoding it was read with. Each following line is a
+key, encoded as a JSON string, then the byte offset and length of its last
+binding in the file, separated by tabs. The lines are sorted, so that a key
+is found by binary search in the memory-mapped index without reading it
+all, and only its binding is read from the .env file.
+
+An index which doesn't match the current state of its .env file is ignored.
+"""
+
+import codecs
+import json
+import locale
+import mmap
+import os
+import tempfile
+from typing import Dict, Optional, Tuple, Union
+
+from .parser import Binding, parse_string, scan
+
+StrPath = Union[str, "os.PathLike[str]"]
+
+_VERSION = 1
+
+
+def index_path(dotenv_path: StrPath) -> str:
+    """Return the path of the index of the .env file at `dotenv_path`."""
+    return os.fspath(dotenv_path) + ".idx"
+
+
+def _encoding_name(encoding: Optional[str]) -> str:
+    # Same default as `open`.
+    return codecs.lookup(encoding or locale.getpreferredencoding(False)).name
+
+
+def _header(path_stat: os.stat_result, encoding: str) -> Dict[str, object]:
+    return {
+        "version": _VERSION,
+        "size": path_stat.st_size,
+        "mtime_ns": path_stat.st_mtime_ns,
+        "inode": path_stat.st_ino,
+        "encoding": encoding,
+    }
+
+
+def build_index(dotenv_path: StrPath, encoding: Optional[str] = "utf-8") -> str:
+    """
+    Index the keys of the .env file at `dotenv_path`, read with `encoding`,
+    and return the path of the index.
+
+    Raises `ValueError` if the bindings encoded again don't add up to the
+    file, which can happen with stateful encodings.
+    """
+    encoding = _encoding_name(encoding)
+    with open(dotenv_path, "rb") as file:
+        path_stat = os.fstat(file.fileno())
+        data = file.read()
+
+    # The offsets are counted by encoding the text of each binding again.
+    # The BOM is left out of the text but not of the data.
+    string = str(data, encoding)
+    if encoding == "utf-8-sig":
+        encoder = codecs.getincrementalencoder("utf-8")()
+        offset = len(codecs.BOM_UTF8) if data.startswith(codecs.BOM_UTF8) else 0
+    else:
+        encoder = codecs.getincrementalencoder(encoding)()
+        offset = 0
+    text = string.removeprefix("\ufeff")
+    offset += len(encoder.encode(string[: len(string) - len(text)]))
+
+    locations: Dict[str, Tuple[int, int]] = {}
+    for binding in scan(text):
+        length = len(encoder.encode(binding.original.string))
+        if binding.key is not None:
+            locations[binding.key] = (offset, length)
+        offset += length
+    if offset + len(encoder.encode("", final=True)) != len(data):
+        raise ValueError(f"Can't compute byte offsets in encoding {encoding}")
+
+    records = sorted(
+        (json.dumps(key), offset, length) for key, (offset, length) in locations.items()
+    )
+    path = index_path(dotenv_path)
+    with tempfile.NamedTemporaryFile(
+        mode="w",
+        encoding="ascii",
+        newline="\n",
+        delete=False,
+        prefix=".tmp_",
+        dir=os.path.dirname(os.path.abspath(path)),
+    ) as dest:
+        dest.write(json.dumps(_header(path_stat, encoding)) + "\n")
+        dest.writelines(
+            f"{key}\t{offset}\t{length}\n" for key, offset, length in records
+        )
+    try:
+        os.replace(dest.name, path)
+    except BaseException:
+        os.unlink(dest.name)
+        raise
+    return path
+
+
+def refresh_index(dotenv_path: StrPath, encoding: Optional[str] = "utf-8") -> None:
+    """
+    Index the .env file at `dotenv_path` again if it has an index.
+
+    The index is removed if it can't be rebuilt in `encoding`, so that it
+    isn't used.
+    """
+    path = index_path(dotenv_path)
+    if not os.path.exists(path):
+        return
+    try:
+        build_index(dotenv_path, encoding)
+    except ValueError:
+        os.remove(path)
+
+
+class Index:
+    """
+    Memory-mapped index of a .env file, see `Index.open`.
+    """
+
+    def __init__(
+        self, dotenv_path: StrPath, data: mmap.mmap, start: int, encoding: str
+    ) -> None:
+        self.dotenv_path = dotenv_path
+        self.encoding = encoding
+        self._data = data
+        self._start = start
+
+    @classmethod
+    def open(
+        cls, dotenv_path: StrPath, encoding: Optional[str] = "utf-8"
+    ) -> Optional["Index"]:
+        """
+        Open the index of `dotenv_path`, or return `None` if it doesn't exist
+        or doesn't match the file or `encoding`.
+        """
+        try:
+            encoding = _encoding_name(encoding)
+            with open(index_path(dotenv_path), "rb") as file:
+                data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        try:
+            start = data.find(b"\n") + 1
+            header = json.loads(data[:start])
+            if header == _header(os.stat(dotenv_path), encoding):
+                return cls(dotenv_path, data, start, encoding)
+        except (OSError, ValueError):
+            pass
+        data.close()
+        return None
+
+    def close(self) -> None:
+        self._data.close()
+
+    def __enter__(self) -> "Index":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def find(self, key: str) -> Optional[Tuple[int, int]]:
+        """Return the byte offset and length of the last binding of `key`."""
+        data = self._data
+        target = json.dumps(key).encode("ascii")
+        low, high = self._start, len(data)
+        # `low` and `high` are always at the start of a line.
+        while low < high:
+            middle = (low + high) // 2
+            line_start = data.rfind(b"\n", low, middle) + 1 or low
+            line_end = data.find(b"\n", middle)
+            fields = data[line_start:line_end].split(b"\t")
+            if fields[0] < target:
+                low = line_end + 1
+            elif fields[0] > target:
+                high = line_start
+            else:
+                return int(fields[1]), int(fields[2])
+        return None
+
+    def read(self, offset: int, length: int) -> Optional[Binding]:
+        """Parse the binding at `offset` in the .env file."""
+        with open(self.dotenv_path, "rb") as file:
+            file.seek(offset)
+            data = file.read(length)
+        # Like a file opened in text mode.
+        string = str(data, self.encoding).replace("\r\n", "\n").replace("\r", "\n")
+        for binding in parse_string(string, keys_only=True):
+            return binding
+        return None
+
+
+def lookup(
+    dotenv_path: StrPath, key: str, encoding: Optional[str] = "utf-8"
+) -> Optional[Tuple[bool, Optional[str]]]:
+    """
+    Look up the value of `key` with the index of `dotenv_path`.
+
+    Returns whether `key` is defined and its value, or `None` if the file has
+    to be parsed: if there is no up-to-date index, or if the value refers to
+    variables and needs to be interpolated.
+    """
+    index = Index.open(dotenv_path, encoding)
+    if index is None:
+        return None
+    with index:
+        location = index.find(key)
+        if location is None:
+            return False, None
+        binding = index.read(*location)
+    if binding is None or binding.key != key:
+        return None
+    if binding.value is not None and "${" in binding.value:
+        return None
+    return True, binding.value
@@ -1,16 +1,51 @@
+import hashlib
 import io
+import locale
 import logging
+import mmap
 import os
 import pathlib
 import stat
 import sys
 import tempfile
-from collections import OrderedDict
+from collections import ChainMap, OrderedDict
 from contextlib import contextmanager
-from typing import IO, Dict, Iterable, Iterator, Mapping, Optional, Tuple, Union
-
-from .parser import Binding, parse_stream
-from .variables import parse_variables
+from types import ModuleType
+from typing import (
+    IO,
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
+
+from .cache import load_values, parse_cache
+from .freeze import load_frozen
+from .graph import VariableGraph
+from .index import lookup, refresh_index
+from .parser import (
+    Binding,
+    Buffer,
+    Diagnostic,
+    diagnose,
+    get_scanner,
+    parse_bytes,
+    parse_complete,
+    parse_pairs,
+    parse_pairs_parallel,
+    parse_stream,
+    parse_string,
+    scan_bytes,
+)
+from .variables import compile_template
 
 # A type alias for a string path to be used for the paths in this file.
 # These paths may flow to `open()` and `os.replace()`.
@@ -18,6 +53,18 @@ StrPath = Union[str, "os.PathLike[str]"]
 
 logger = logging.getLogger(__name__)
 
+# How many locations the warning about statements which couldn't be parsed
+# lists, however many there are.
+MAX_WARNED_LINES = 10
+
+# Files are parsed in chunks of this many characters, so that reading large
+# files or FIFOs only keeps the pending bindings in memory.
+CHUNK_SIZE = 64 * 1024
+
+# Files up to this many bytes are read whole instead, so that the text parsed
+# is remembered and `DotEnv.reload` only parses what is appended to it.
+PREFIX_MAX_SIZE = 1024 * 1024
+
 
 def _load_dotenv_disabled() -> bool:
     """
@@ -29,14 +76,92 @@ def _load_dotenv_disabled() -> bool:
     return value in {"1", "true", "t", "yes", "y"}
 
 
-def with_warn_for_invalid_lines(mappings: Iterator[Binding]) -> Iterator[Binding]:
-    for mapping in mappings:
-        if mapping.error:
+class _InvalidLines:
+    """
+    Lines of the statements which couldn't be parsed, reported in a single
+    warning so that a broken file doesn't log one record per line.
+    """
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.lines: List[int] = []
+
+    def add(self, line: int) -> None:
+        self.count += 1
+        if len(self.lines) < MAX_WARNED_LINES:
+            self.lines.append(line)
+
+    def warn(self) -> None:
+        if self.count == 1:
             logger.warning(
                 "python-dotenv could not parse statement starting at line %s",
-                mapping.original.line,
+                self.lines[0],
+            )
+        elif self.count > 1:
+            logger.warning(
+                "python-dotenv could not parse %s statements starting at lines %s%s",
+                self.count,
+                ", ".join(map(str, self.lines)),
+                ", ..." if self.count > len(self.lines) else "",
             )
+
+
+def with_warn_for_invalid_lines(mappings: Iterator[Binding]) -> Iterator[Binding]:
+    invalid_lines = _InvalidLines()
+    for mapping in mappings:
+        if mapping.error:
+            invalid_lines.add(mapping.original.line)
         yield mapping
+    invalid_lines.warn()
+
+
+def _values(
+    bindings: Iterable[Binding], invalid_lines: _InvalidLines
+) -> List[Tuple[str, Optional[str]]]:
+    values = []
+    for mapping in bindings:
+        if mapping.error:
+            invalid_lines.add(mapping.original.line)
+        elif mapping.key is not None:
+            values.append((mapping.key, mapping.value))
+    return values
+
+
+class _ParsedPrefix(NamedTuple):
+    """
+    Text of a .env file which was parsed and won't change how the text which
+    may be appended to it is parsed.
+    """
+
+    chars: int
+    digest: bytes
+    line: int
+    values: List[Tuple[str, Optional[str]]]
+
+
+class _Resolution(NamedTuple):
+    """Interpolated values and what they were interpolated from."""
+
+    graph: VariableGraph
+    values: Dict[str, Optional[str]]
+    environ: Dict[str, str]
+
+
+def _pair_values(
+    pairs: Iterable[Tuple[Optional[str], Optional[str], int]],
+    invalid_lines: _InvalidLines,
+) -> List[Tuple[str, Optional[str]]]:
+    values = []
+    for key, value, line in pairs:
+        if key is None:
+            invalid_lines.add(line)
+        else:
+            values.append((key, value))
+    return values
+
+
+def _digest(text: str) -> bytes:
+    return hashlib.blake2b(text.encode("utf-8", "surrogatepass")).digest()
 
 
 class DotEnv:
@@ -48,14 +173,47 @@ class DotEnv:
         encoding: Optional[str] = None,
         interpolate: bool = True,
         override: bool = True,
+        memory_map: bool = False,
+        content: Optional[Union[str, Buffer]] = None,
+        dialect: str = "full",
+        keys: Optional[Iterable[str]] = None,
+        prefix: Optional[str] = None,
+        workers: Optional[int] = None,
+        diagnostics: Optional[List[Diagnostic]] = None,
+        cache: bool = False,
+        disk_cache: bool = False,
+        frozen: Optional[Union[ModuleType, str]] = None,
+        forward_references: bool = False,
     ) -> None:
+        get_scanner(dialect)
         self.dotenv_path: Optional[StrPath] = dotenv_path
         self.stream: Optional[IO[str]] = stream
         self._dict: Optional[Dict[str, Optional[str]]] = None
+        self._raw_values: Optional[List[Tuple[str, Optional[str]]]] = None
+        self._prefix: Optional[_ParsedPrefix] = None
+        self._stamp: Optional[Tuple[int, int, int, int]] = None
+        self._graph: Optional[VariableGraph] = None
+        self._resolution: Optional[_Resolution] = None
+        # Whether the text parsed is remembered for `reload`. Functions which
+        # load a file once and discard their `DotEnv` don't pay for it.
+        self._remember_prefix = True
         self.verbose: bool = verbose
         self.encoding: Optional[str] = encoding
         self.interpolate: bool = interpolate
         self.override: bool = override
+        self.memory_map: bool = memory_map
+        self.content: Optional[Union[str, Buffer]] = content
+        self.dialect: str = dialect
+        self.keys: Optional[FrozenSet[str]] = None if keys is None else frozenset(keys)
+        self.prefix: Optional[str] = prefix
+        self.workers: Optional[int] = workers
+        self.diagnostics: Optional[List[Diagnostic]] = diagnostics
+        self.cache: bool = cache
+        self.disk_cache: bool = disk_cache
+        self.forward_references: bool = forward_references
+        self.frozen: Optional[ModuleType] = (
+            None if frozen is None else load_frozen(frozen)
+        )
 
     @contextmanager
     def _get_stream(self) -> Iterator[IO[str]]:
@@ -74,23 +232,364 @@ class DotEnv:
 
     def dict(self) -> Dict[str, Optional[str]]:
         """Return dotenv as dict"""
-        if self._dict:
+        if self._dict is not None:
             return self._dict
 
-        raw_values = self.parse()
+        raw_values: Iterable[Tuple[str, Optional[str]]]
+        if self._raw_values is None:
+            raw_values = self.parse()
+        else:
+            raw_values = self._raw_values
+        selected: Optional[List[str]] = None
+        interpolate = self.interpolate and not (
+            self.frozen and self.frozen.INTERPOLATED
+        )
 
-        if self.interpolate:
-            self._dict = OrderedDict(
-                resolve_variables(raw_values, override=self.override)
-            )
+        if self.keys is not None or self.prefix is not None:
+            raw_values = list(raw_values)
+            selected = [
+                name
+                for name in dict.fromkeys(name for name, _ in raw_values)
+                if self._is_selected(name)
+            ]
+            if interpolate and not self.forward_references:
+                raw_values = needed_variables(raw_values, selected)
+
+        values: Mapping[str, Optional[str]]
+        if interpolate and self.forward_references:
+            values = self._resolve_graph(raw_values, selected)
+        elif interpolate:
+            values = resolve_variables(raw_values, override=self.override)
+        else:
+            values = OrderedDict(raw_values)
+
+        if selected is None:
+            self._dict = OrderedDict(values)
         else:
-            self._dict = OrderedDict(raw_values)
+            self._dict = OrderedDict((name, values[name]) for name in selected)
 
         return self._dict
 
-    def parse(self) -> Iterator[Tuple[str, Optional[str]]]:
+    def _resolve_graph(
+        self,
+        raw_values: Iterable[Tuple[str, Optional[str]]],
+        selected: Optional[List[str]],
+    ) -> Dict[str, Optional[str]]:
+        # After a reload, only the keys whose definitions, references or
+        # environment variables changed, and the keys which depend on them, are
+        # interpolated again.
+        graph = VariableGraph(raw_values)
+        environ = dict(os.environ)
+        known: Optional[Dict[str, Optional[str]]] = None
+        previous = self._resolution
+        if previous is not None:
+            changed = graph.changed(previous.graph)
+            if environ != previous.environ:
+                for name in previous.environ.keys() | environ.keys():
+                    if previous.environ.get(name) != environ.get(name):
+                        changed |= graph.affected(graph.readers(name))
+            known = {
+                key: value
+                for key, value in previous.values.items()
+                if key not in changed
+            }
+
+        values = graph.resolve(self.override, selected, known, environ)
+        self._graph = graph
+        self._resolution = _Resolution(graph, values, environ)
+        return values
+
+    def variable_graph(self) -> VariableGraph:
+        """
+        Return the graph of the references between the keys of the file, e.g.
+        to find the keys which depend on another one.
+
+        See `dotenv.graph.VariableGraph`.
+        """
+        if self._graph is None:
+            raw_values = self._raw_values
+            if raw_values is None:
+                raw_values = list(self.parse())
+            self._graph = VariableGraph(raw_values)
+        return self._graph
+
+    def _file_stamp(self) -> Optional[Tuple[int, int, int, int]]:
+        # The identity and state of the file, if it is a regular file.
+        if self.dotenv_path is None or self.frozen is not None:
+            return None
+        try:
+            path_stat = os.stat(self.dotenv_path)
+        except (OSError, ValueError):
+            return None
+        if not stat.S_ISREG(path_stat.st_mode):
+            return None
+        return (
+            path_stat.st_dev,
+            path_stat.st_ino,
+            path_stat.st_size,
+            path_stat.st_mtime_ns,
+        )
+
+    def is_stale(self) -> bool:
+        """
+        Return whether the values returned by `dict` may no longer match the
+        .env file: if they weren't computed yet, or if the file was modified,
+        replaced, created or removed since, according to `os.stat`.
+
+        Streams, content and frozen modules don't change once they are loaded.
+        """
+        return self._dict is None or self._file_stamp() != self._stamp
+
+    def invalidate(self) -> None:
+        """Forget the values, so that `dict` loads them again."""
+        self._dict = None
+        self._raw_values = None
+        self._graph = None
+        self._resolution = None
+        self._stamp = None
+
+    def reload(self) -> Dict[str, Optional[str]]:
+        """
+        Load the .env file again if it is stale (see `is_stale`) and return its
+        values as a dict.
+
+        The text parsed when the file was last loaded, by `dict` or `reload`,
+        is remembered by its length and hash. If the file has only grown since,
+        only the appended text is parsed and its bindings are added to those
+        already parsed. Any other change, or a stream, content, `workers`,
+        `diagnostics`, `memory_map`, a file larger than `PREFIX_MAX_SIZE` or
+        one loaded from a cache, leads to a full parse. A frozen module is used
+        instead of the file.
+        """
+        if not self.is_stale():
+            return self.dict()
+
+        self._dict = None
+        self._graph = None
+        if (
+            self.workers is not None
+            or self.diagnostics is not None
+            or self.frozen is not None
+        ):
+            self._raw_values = list(self.parse())
+        else:
+            self._stamp = self._file_stamp()
+            self._raw_values = self._parse_appended()
+        return self.dict()
+
+    def reload_changes(self) -> Set[str]:
+        """
+        Reload the .env file like `reload`, and return the keys whose values
+        changed, including the keys which were added or removed.
+
+        With `forward_references`, only the keys whose definitions changed and
+        the keys which depend on them are interpolated again, so a long-running
+        program can reconfigure only what the returned keys affect.
+        """
+        previous = self._dict
+        values = self.reload()
+        if previous is None:
+            return set(values)
+        if values is previous:
+            return set()
+        missing = object()
+        return {
+            key
+            for key in previous.keys() | values.keys()
+            if previous.get(key, missing) != values.get(key, missing)
+        }
+
+    def _remembers_prefix(self) -> bool:
+        # Whether the regular file being loaded, whose stamp was just taken, is
+        # parsed with `_parse_file` so that `reload` can use its prefix.
+        return (
+            self._remember_prefix
+            and self._stamp is not None
+            and self._stamp[2] <= PREFIX_MAX_SIZE
+            and self.workers is None
+            and self.diagnostics is None
+            and not self.memory_map
+        )
+
+    def _parse_appended(self) -> List[Tuple[str, Optional[str]]]:
+        if self.dotenv_path is None or not os.path.isfile(self.dotenv_path):
+            self._prefix = None
+            return list(self.parse())
+        return self._parse_file()
+
+    def _parse_file(self) -> List[Tuple[str, Optional[str]]]:
+        # Parse the text after the remembered prefix if it is unchanged, and
+        # remember the new prefix.
+        assert self.dotenv_path is not None
+        with open(self.dotenv_path, encoding=self.encoding) as stream:
+            text = stream.read().removeprefix("\ufeff")
+
+        prefix = self._prefix
+        if (
+            prefix is None
+            or len(text) < prefix.chars
+            or _digest(text[: prefix.chars]) != prefix.digest
+        ):
+            prefix = _ParsedPrefix(0, _digest(""), 1, [])
+        tail = text[prefix.chars :]
+        invalid_lines = _InvalidLines()
+
+        if self.dialect == "full":
+            # The bindings at the end of the file may continue in appended
+            # text, so they aren't part of the next prefix.
+            complete, chars, line = parse_complete(
+                tail, prefix.line, False, True, self.dialect
+            )
+            rest, _, _ = parse_complete(tail[chars:], line, True, True, self.dialect)
+            values = prefix.values + _values(complete, invalid_lines)
+            rest_values = _values(rest, invalid_lines)
+        else:
+            # Each line is a binding, and only the last one may continue.
+            chars = tail.rfind("\n") + 1
+            line = prefix.line + tail.count("\n", 0, chars)
+            pairs = parse_pairs(
+                io.StringIO(tail[:chars]), None, self.dialect, prefix.line
+            )
+            values = prefix.values + _pair_values(pairs, invalid_lines)
+            pairs = parse_pairs(io.StringIO(tail[chars:]), None, self.dialect, line)
+            rest_values = _pair_values(pairs, invalid_lines)
+
+        end = prefix.chars + chars
+        self._prefix = _ParsedPrefix(end, _digest(text[:end]), line, values)
+        invalid_lines.warn()
+        return values + rest_values
+
+    def _is_selected(self, name: str) -> bool:
+        return (self.keys is not None and name in self.keys) or (
+            self.prefix is not None and name.startswith(self.prefix)
+        )
+
+    @contextmanager
+    def _get_bindings(self, keys_only: bool = True) -> Iterator[Iterator[Binding]]:
+        if (
+            self.memory_map
+            and self.encoding
+            and self.dotenv_path
+            and self.dialect == "full"
+        ):
+            with _map_file(self.dotenv_path) as data:
+                # Text mode would translate "\r\n" and "\r", which isn't
+                # possible in place.
+                if data is not None and data.find(b"\r") < 0:
+                    yield scan_bytes(data, self.encoding, keys_only=keys_only)
+                    return
+
+        if self.content is not None and not (
+            self.dotenv_path and _is_file_or_fifo(self.dotenv_path)
+        ):
+            if isinstance(self.content, str):
+                yield parse_string(self.content, keys_only, self.dialect)
+            else:
+                yield parse_bytes(
+                    self.content, self._content_encoding(), keys_only, self.dialect
+                )
+            return
+
         with self._get_stream() as stream:
-            for mapping in with_warn_for_invalid_lines(parse_stream(stream)):
+            yield parse_stream(stream, CHUNK_SIZE, keys_only, self.dialect)
+
+    @contextmanager
+    def _get_pairs(
+        self,
+    ) -> Iterator[Iterator[Tuple[Optional[str], Optional[str], int]]]:
+        if self.content is not None and not (
+            self.dotenv_path and _is_file_or_fifo(self.dotenv_path)
+        ):
+            if isinstance(self.content, str):
+                string = self.content
+            else:
+                # Like a file opened in text mode.
+                string = str(self.content, self._content_encoding())
+                string = string.replace("\r\n", "\n").replace("\r", "\n")
+            if self.workers is not None:
+                yield parse_pairs_parallel(string, self.workers, self.dialect)
+            else:
+                yield parse_pairs(io.StringIO(string), dialect=self.dialect)
+            return
+
+        with self._get_stream() as stream:
+            if self.workers is not None:
+                yield parse_pairs_parallel(stream.read(), self.workers, self.dialect)
+            else:
+                yield parse_pairs(stream, CHUNK_SIZE, self.dialect)
+
+    def _content_encoding(self) -> str:
+        # Same default as `open`.
+        return self.encoding or locale.getpreferredencoding(False)
+
+    def parse(self) -> Iterator[Tuple[str, Optional[str]]]:
+        if self.frozen is not None:
+            yield from self.frozen.VALUES.items()
+            return
+
+        path = self.dotenv_path
+        key = None
+        if (self.cache or self.disk_cache) and path and self.diagnostics is None:
+            key = parse_cache.key(path, self.encoding, self.dialect)
+        # The state of the file before it is parsed, for `is_stale`, from the
+        # cache key if there is one so that a hit costs a single `stat` call.
+        self._stamp = self._file_stamp() if key is None else key[:4]
+        if path is None or key is None:
+            if self._remembers_prefix():
+                yield from self._parse_file()
+            else:
+                yield from self._parse()
+            return
+
+        values = parse_cache.get(key) if self.cache else None
+        if values is None:
+            if self.disk_cache:
+                values = load_values(
+                    path, self.encoding, self.dialect, self._parse_data
+                )
+            else:
+                values = tuple(self._parse())
+            # Unless the file changed while it was parsed.
+            if self.cache and parse_cache.key(path, self.encoding, self.dialect) == key:
+                parse_cache.put(key, values)
+        yield from values
+
+    def _parse_data(self, data: bytes) -> Tuple[Tuple[str, Optional[str]], ...]:
+        # Like a file opened in text mode.
+        string = str(data, self._content_encoding())
+        string = string.replace("\r\n", "\n").replace("\r", "\n")
+        dotenv = DotEnv(
+            None, content=string, dialect=self.dialect, workers=self.workers
+        )
+        return tuple(dotenv._parse())
+
+    def _parse(self) -> Iterator[Tuple[str, Optional[str]]]:
+        if self.diagnostics is not None:
+            # Offsets need every binding, so this parses serially.
+            offset = 0
+            with self._get_bindings(keys_only=False) as bindings:
+                for mapping in bindings:
+                    if mapping.error:
+                        self.diagnostics.append(diagnose(mapping, offset, self.dialect))
+                    elif mapping.key is not None:
+                        yield mapping.key, mapping.value
+                    offset += mapping.original.length
+            return
+
+        if self.dialect != "full" or self.workers is not None:
+            # Line-based dialects and parallel parsing don't need bindings.
+            invalid_lines = _InvalidLines()
+            with self._get_pairs() as pairs:
+                for key, value, line in pairs:
+                    if key is not None:
+                        yield key, value
+                    else:
+                        invalid_lines.add(line)
+            invalid_lines.warn()
+            return
+
+        with self._get_bindings() as bindings:
+            for mapping in with_warn_for_invalid_lines(bindings):
                 if mapping.key is not None:
                     yield mapping.key, mapping.value
 
@@ -131,8 +630,119 @@ def get_key(
     Get the value of a given key from the given .env.
 
     Returns `None` if the key isn't found or doesn't have a value.
+
+    If the file has an up-to-date index (see `dotenv.index.build_index`), only the
+    binding of the key is read and parsed, unless its value refers to variables.
     """
-    return DotEnv(dotenv_path, verbose=True, encoding=encoding).get(key_to_get)
+    result = lookup(dotenv_path, key_to_get, encoding)
+    if result is not None:
+        defined, value = result
+        if not defined:
+            logger.warning("Key %s not found in %s.", key_to_get, dotenv_path)
+        return value
+
+    dotenv = DotEnv(dotenv_path, verbose=True, encoding=encoding, keys=[key_to_get])
+    dotenv._remember_prefix = False
+    return dotenv.get(key_to_get)
+
+
+def get_keys(
+    dotenv_path: StrPath,
+    keys_to_get: Iterable[str],
+    encoding: Optional[str] = "utf-8",
+) -> Dict[str, Optional[str]]:
+    """
+    Get the values of the given keys from the given .env, parsing it once.
+
+    Keys which aren't found or don't have a value map to `None`.
+    """
+    keys_to_get = list(keys_to_get)
+    dotenv = DotEnv(dotenv_path, verbose=True, encoding=encoding, keys=keys_to_get)
+    dotenv._remember_prefix = False
+    return {key: dotenv.get(key) for key in keys_to_get}
+
+
+def list_keys(
+    dotenv_path: Optional[StrPath] = None,
+    stream: Optional[IO[str]] = None,
+    encoding: Optional[str] = "utf-8",
+    dialect: str = "full",
+) -> List[str]:
+    """
+    Return the keys of a .env file in the order they are first defined.
+
+    Values are neither interpolated nor collected. If `dotenv_path` and `stream`
+    are both `None`, `find_dotenv()` is used to find the .env file.
+    """
+    if dotenv_path is None and stream is None:
+        dotenv_path = find_dotenv()
+
+    dotenv = DotEnv(dotenv_path, stream=stream, encoding=encoding, dialect=dialect)
+    dotenv._remember_prefix = False
+    return list(dict.fromkeys(key for key, _ in dotenv.parse()))
+
+
+def _frame(string: str) -> bytes:
+    data = string.encode("utf-8", "surrogatepass")
+    return len(data).to_bytes(8, "little") + data
+
+
+def fingerprint(
+    dotenv_path: Optional[StrPath] = None,
+    stream: Optional[IO[str]] = None,
+    interpolate: bool = False,
+    encoding: Optional[str] = "utf-8",
+    dialect: str = "full",
+) -> str:
+    """
+    Return a hex digest of the variables defined by a .env file, e.g. as a
+    cache key which doesn't change with formatting or comments.
+
+    The (key, value) pairs are hashed as they are parsed, in order, so moving
+    or repeating a definition changes the digest but the quoting, spacing and
+    comments don't. With `interpolate`, the values are hashed after being
+    interpolated against the current environment. If `dotenv_path` and `stream`
+    are both `None`, `find_dotenv()` is used to find the .env file.
+    """
+    if dotenv_path is None and stream is None:
+        dotenv_path = find_dotenv()
+
+    dotenv = DotEnv(dotenv_path, stream=stream, encoding=encoding, dialect=dialect)
+    dotenv._remember_prefix = False
+    pairs: Iterable[Tuple[str, Optional[str]]] = dotenv.parse()
+    if interpolate:
+        pairs = iter_resolved_variables(pairs, override=True)
+
+    digest = hashlib.blake2b(person=b"dotenv-fp-1")
+    for key, value in pairs:
+        digest.update(_frame(key))
+        digest.update(b"\0" if value is None else b"\1" + _frame(value))
+    return digest.hexdigest()
+
+
+def parse_diagnostics(
+    path_or_stream: Union[StrPath, IO[str]],
+    encoding: Optional[str] = "utf-8",
+    dialect: str = "full",
+) -> List[Diagnostic]:
+    """
+    Return where and why the statements of a .env file which can't be parsed
+    fail, in one pass over the file and without logging them.
+
+    `path_or_stream` is the path of the file or a text stream.
+    """
+    diagnostics: List[Diagnostic] = []
+    if isinstance(path_or_stream, (str, os.PathLike)):
+        dotenv = DotEnv(
+            path_or_stream, encoding=encoding, dialect=dialect, diagnostics=diagnostics
+        )
+    else:
+        dotenv = DotEnv(
+            None, stream=path_or_stream, dialect=dialect, diagnostics=diagnostics
+        )
+    for _ in dotenv.parse():
+        pass
+    return diagnostics
 
 
 @contextmanager
@@ -242,6 +852,7 @@ def set_key(
                 dest.write("\n")
             dest.write(line_out)
 
+    refresh_index(dotenv_path, encoding)
     return True, key_to_set, value_to_set
 
 
@@ -277,6 +888,7 @@ def unset_key(
             else:
                 dest.write(mapping.original.string)
 
+    refresh_index(dotenv_path, encoding)
     if not removed:
         logger.warning(
             "Key %s not removed from %s - key doesn't exist.", key_to_unset, dotenv_path
@@ -290,25 +902,58 @@ def resolve_variables(
     values: Iterable[Tuple[str, Optional[str]]],
     override: bool,
 ) -> Mapping[str, Optional[str]]:
+    return dict(iter_resolved_variables(values, override))
+
+
+def iter_resolved_variables(
+    values: Iterable[Tuple[str, Optional[str]]],
+    override: bool,
+) -> Iterator[Tuple[str, Optional[str]]]:
+    """
+    Interpolate each definition in `values` with the variables defined before
+    it and the environment, and yield it as soon as it is resolved.
+
+    Variables are looked up in a single view of both, built once: with
+    `override`, the definitions take precedence over the environment.
+    """
     new_values: Dict[str, Optional[str]] = {}
+    # A snapshot, which is faster to look up than `os.environ` itself.
+    environ: Dict[str, Optional[str]] = dict(os.environ)
+    env = ChainMap(new_values, environ) if override else ChainMap(environ, new_values)
 
     for name, value in values:
-        if value is None:
-            result = None
+        if value is None or "${" not in value:
+            result = value
         else:
-            atoms = parse_variables(value)
-            env: Dict[str, Optional[str]] = {}
-            if override:
-                env.update(os.environ)  # type: ignore
-                env.update(new_values)
-            else:
-                env.update(new_values)
-                env.update(os.environ)  # type: ignore
-            result = "".join(atom.resolve(env) for atom in atoms)
+            result = compile_template(value).substitute(env)
 
         new_values[name] = result
+        yield name, result
+
 
-    return new_values
+def needed_variables(
+    values: Sequence[Tuple[str, Optional[str]]],
+    names: Iterable[str],
+) -> List[Tuple[str, Optional[str]]]:
+    """
+    Keep the definitions in `values` which interpolating the last definition of
+    each of `names` depends on, directly or not.
+
+    A value only refers to the variables defined before it, so going backwards,
+    a definition is needed if its name is wanted, and then that name is
+    satisfied and the names its value refers to are wanted in turn.
+    """
+    wanted = set(names)
+    needed = []
+    for name, value in reversed(values):
+        if name not in wanted:
+            continue
+        needed.append((name, value))
+        wanted.discard(name)
+        if value is not None and "${" in value:
+            wanted.update(compile_template(value).names)
+    needed.reverse()
+    return needed
 
 
 def _walk_to_root(path: str) -> Iterator[str]:
@@ -387,6 +1032,17 @@ def load_dotenv(
     override: bool = False,
     interpolate: bool = True,
     encoding: Optional[str] = "utf-8",
+    memory_map: bool = False,
+    content: Optional[Union[str, bytes]] = None,
+    dialect: str = "full",
+    keys: Optional[Iterable[str]] = None,
+    prefix: Optional[str] = None,
+    workers: Optional[int] = None,
+    diagnostics: Optional[List[Diagnostic]] = None,
+    cache: bool = False,
+    disk_cache: bool = False,
+    frozen: Optional[Union[ModuleType, str]] = None,
+    forward_references: bool = False,
 ) -> bool:
     """Parse a .env file and then load all the variables found as environment variables.
 
@@ -399,11 +1055,27 @@ def load_dotenv(
             from the `.env` file.
         interpolate: Whether to interpolate variables using POSIX variable expansion.
         encoding: Encoding to be used to read the file.
+        memory_map: Whether to memory-map the file and parse it in place instead
+            of reading it. See `dotenv_values`.
+        content: .env content as a string, or as bytes decoded with `encoding`,
+            used if `dotenv_path` is `None`.
+        dialect: Syntax of the file. See `dotenv_values`.
+        keys: Only load these variables. See `dotenv_values`.
+        prefix: Only load the variables whose name starts with this.
+        workers: Number of processes to parse the file with. See `dotenv_values`.
+        diagnostics: List to append the statements which can't be parsed to. See
+            `dotenv_values`.
+        cache: Whether to use the process-wide parse cache. See `dotenv_values`.
+        disk_cache: Whether to use the on-disk parse cache. See `dotenv_values`.
+        frozen: Module generated by `dotenv freeze`, or its name, to load the
+            values from instead of a file. See `dotenv_values`.
+        forward_references: Whether values can refer to variables defined after
+            them. See `dotenv_values`.
     Returns:
         Bool: True if at least one environment variable is set else False
 
-    If both `dotenv_path` and `stream` are `None`, `find_dotenv()` is used to find the
-    .env file with its default parameters. If you need to change the default parameters
+    If `dotenv_path`, `stream` and `content` are all `None`, `find_dotenv()` is used to
+    find the .env file with its default parameters. If you need to change the default parameters
     of `find_dotenv()`, you can explicitly call `find_dotenv()` and pass the result
     to this function as `dotenv_path`.
 
@@ -416,7 +1088,9 @@ def load_dotenv(
         )
         return False
 
-    if dotenv_path is None and stream is None:
+    if frozen is not None:
+        dotenv_path = None
+    elif dotenv_path is None and stream is None and content is None:
         dotenv_path = find_dotenv()
 
     dotenv = DotEnv(
@@ -426,7 +1100,19 @@ def load_dotenv(
         interpolate=interpolate,
         override=override,
         encoding=encoding,
+        memory_map=memory_map,
+        content=content,
+        dialect=dialect,
+        keys=keys,
+        prefix=prefix,
+        workers=workers,
+        diagnostics=diagnostics,
+        cache=cache,
+        disk_cache=disk_cache,
+        frozen=frozen,
+        forward_references=forward_references,
     )
+    dotenv._remember_prefix = False
     return dotenv.set_as_environment_variables()
 
 
@@ -436,6 +1122,17 @@ def dotenv_values(
     verbose: bool = False,
     interpolate: bool = True,
     encoding: Optional[str] = "utf-8",
+    memory_map: bool = False,
+    content: Optional[Union[str, bytes]] = None,
+    dialect: str = "full",
+    keys: Optional[Iterable[str]] = None,
+    prefix: Optional[str] = None,
+    workers: Optional[int] = None,
+    diagnostics: Optional[List[Diagnostic]] = None,
+    cache: bool = False,
+    disk_cache: bool = False,
+    frozen: Optional[Union[ModuleType, str]] = None,
+    forward_references: bool = False,
 ) -> Dict[str, Optional[str]]:
     """
     Parse a .env file and return its content as a dict.
@@ -450,21 +1147,120 @@ def dotenv_values(
         verbose: Whether to output a warning if the .env file is missing.
         interpolate: Whether to interpolate variables using POSIX variable expansion.
         encoding: Encoding to be used to read the file.
-
-    If both `dotenv_path` and `stream` are `None`, `find_dotenv()` is used to find the
-    .env file.
+        memory_map: Whether to memory-map the file and parse it in place instead
+            of reading it.
+        content: .env content as a string, or as bytes decoded with `encoding`,
+            used if `dotenv_path` is `None`.
+        dialect: Syntax of the file: "full" (the default), "simple" or "docker".
+        keys: Only return these variables.
+        prefix: Only return the variables whose name starts with this.
+        workers: Number of processes to parse the file with, for very large files.
+        diagnostics: List to append a `dotenv.parser.Diagnostic` to for each
+            statement which can't be parsed, instead of logging them.
+        cache: Whether to use the process-wide parse cache.
+        disk_cache: Whether to use the on-disk parse cache.
+        frozen: Module generated by `dotenv freeze`, or its name, to load the
+            values from instead of a file.
+        forward_references: Whether values can refer to variables defined after
+            them.
+
+    If `dotenv_path`, `stream` and `content` are all `None`, `find_dotenv()` is used to
+    find the .env file.
+
+    With `memory_map`, UTF-8 and ASCII files are parsed directly in the mapped memory
+    and only the keys and values are decoded, which saves memory with large files.
+    Files which can't be mapped (e.g. FIFOs), files with `\\r` line endings and the
+    "simple" and "docker" dialects are read normally.
+
+    The "full" dialect is the syntax described in the documentation, with quotes,
+    escapes, `export` and comments. In the "simple" dialect, for generated files,
+    each line is `KEY=VALUE` or `KEY` and is split at the first `=`, without any
+    other processing, which is several times faster. The "docker" dialect follows
+    `docker run --env-file`: like "simple", but with comments and leading whitespace
+    ignored and keys containing whitespace rejected. Values are interpolated in all
+    dialects unless `interpolate` is false, which docker itself never does.
+
+    With `keys` or `prefix`, the result has the variables which match either, and
+    only they and the variables their values refer to are interpolated.
+
+    With `workers`, the whole file is read and split into that many chunks, which
+    are parsed in parallel in a process pool (see `dotenv.parser.parse_parallel`)
+    and then interpolated in order. The result is the same, but this only pays off
+    for files with hundreds of thousands of lines and with several CPUs.
+
+    Statements which can't be parsed are skipped and reported in a single warning
+    with their count and the lines of the first few. With `diagnostics`, nothing is
+    logged and the line, column, offset and reason of each failure are appended to
+    it instead. The file is then parsed serially, even with `workers`.
+
+    With `cache`, the parsed values of regular files are kept in a process-wide cache
+    (see `dotenv.cache`), so that loading them again while they are unchanged only
+    costs a `stat` call. Values are still interpolated on each call.
+
+    With `disk_cache`, they are also stored in files of the user's cache directory
+    (see `dotenv.cache.load_values`), which processes loading the same file reuse
+    after checking its size, modification time and content hash.
+
+    With `frozen`, the values come from a module generated by `dotenv freeze` (see
+    `dotenv.freeze.freeze`), without any file being read or parsed. They are only
+    interpolated if they weren't when the module was generated.
+
+    Values are interpolated from top to bottom, with the variables defined before
+    them. With `forward_references`, each variable is instead interpolated after
+    those it refers to, wherever they are defined, using their last definition
+    (see `dotenv.graph.VariableGraph`). `dotenv.graph.CyclicReferenceError`, a
+    `ValueError`, is raised if values refer to each other in a cycle.
     """
-    if dotenv_path is None and stream is None:
+    if frozen is not None:
+        dotenv_path = None
+    elif dotenv_path is None and stream is None and content is None:
         dotenv_path = find_dotenv()
 
-    return DotEnv(
+    dotenv = DotEnv(
         dotenv_path=dotenv_path,
         stream=stream,
         verbose=verbose,
         interpolate=interpolate,
         override=True,
         encoding=encoding,
-    ).dict()
+        memory_map=memory_map,
+        content=content,
+        dialect=dialect,
+        keys=keys,
+        prefix=prefix,
+        workers=workers,
+        diagnostics=diagnostics,
+        cache=cache,
+        disk_cache=disk_cache,
+        frozen=frozen,
+        forward_references=forward_references,
+    )
+    dotenv._remember_prefix = False
+    return dotenv.dict()
+
+
+@contextmanager
+def _map_file(path: StrPath) -> Iterator[Optional[mmap.mmap]]:
+    """
+    Memory-map the regular file at `path` for reading.
+
+    Yields `None` if `path` isn't a regular file or can't be mapped, which is
+    notably the case of empty files.
+    """
+    data: Optional[mmap.mmap] = None
+    if os.path.isfile(path):
+        try:
+            with open(path, "rb") as file:
+                data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            data = None
+
+    if data is None:
+        yield None
+        return
+
+    with data:
+        yield data
 
 
 def _is_file_or_fifo(path: StrPath) -> bool:
@@ -1,20 +1,55 @@
 import codecs
+import mmap
 import re
+from bisect import bisect_right
+from itertools import zip_longest
 from typing import (
     IO,
+    Any,
+    Callable,
     Iterator,
-    Match,
+    List,
     NamedTuple,
     Optional,
     Pattern,
     Sequence,
+    Tuple,
+    Union,
+    cast,
 )
 
+# Byte sequences the parser can work on in place, e.g. a memory-mapped file.
+Buffer = Union[bytes, bytearray, memoryview, mmap.mmap]
+
 
 def make_regex(string: str, extra_flags: int = 0) -> Pattern[str]:
     return re.compile(string, re.UNICODE | extra_flags)
 
 
+# Whitespace classes of the patterns spelled out for ASCII, in the order in
+# which they must be substituted.
+_ascii_whitespace_classes = (
+    (r"[^\S\r\n]", r"[\t\x0b\x0c\x1c-\x1f ]"),
+    (r"[^=\#\s]", r"[^=\#\t-\r\x1c-\x1f ]"),
+    (r"\s", r"[\t-\r\x1c-\x1f ]"),
+)
+
+
+def make_bytes_regex(regex: Pattern[str]) -> Pattern[bytes]:
+    """
+    Compile the equivalent of `regex` for UTF-8 encoded text.
+
+    UTF-8 encodes ASCII characters as themselves and never uses ASCII bytes
+    in the encoding of other characters, so the result matches the same text
+    as `regex` as long as the input has no non-ASCII whitespace.
+    """
+    pattern = regex.pattern
+    for unicode_class, ascii_class in _ascii_whitespace_classes:
+        pattern = pattern.replace(unicode_class, ascii_class)
+    assert "\\s" not in pattern and "\\S" not in pattern, pattern
+    return re.compile(pattern.encode("ascii"), regex.flags & re.VERBOSE)
+
+
 _newline = make_regex(r"(\r\n|\n|\r)")
 _multiline_whitespace = make_regex(r"\s*", extra_flags=re.MULTILINE)
 _whitespace = make_regex(r"[^\S\r\n]*")
@@ -22,19 +57,214 @@ _export = make_regex(r"(?:export[^\S\r\n]+)?")
 _single_quoted_key = make_regex(r"'([^']+)'")
 _unquoted_key = make_regex(r"([^=\#\s]+)")
 _equal_sign = make_regex(r"(=[^\S\r\n]*)")
-_single_quoted_value = make_regex(r"'((?:\\'|[^'])*)'")
-_double_quoted_value = make_regex(r'"((?:\\"|[^"])*)"')
 _unquoted_value = make_regex(r"([^\r\n]*)")
 _comment = make_regex(r"(?:[^\S\r\n]*#[^\r\n]*)?")
 _end_of_line = make_regex(r"[^\S\r\n]*(?:\r\n|\n|\r|$)")
+_inline_comment = make_regex(r"\s#")
 _rest_of_line = make_regex(r"[^\r\n]*(?:\r|\n|\r\n)?")
-_double_quote_escapes = make_regex(r"\\[\\'\"abfnrtv]")
-_single_quote_escapes = make_regex(r"\\[\\']")
+_binding_tail = make_regex(r"[^\S\r\n]*(?:\#[^\r\n]*)?(?:\r\n|\n|\r|$)")
+_double_quote_escapes = make_regex(r"\\([\\'\"abfnrtv])")
+_single_quote_escapes = make_regex(r"\\([\\'])")
+# What the characters captured by the escape patterns decode to, where it
+# differs from themselves.
+_escape_table = str.maketrans(
+    {"a": "\a", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t", "v": "\v"}
+)
 
+# A whole binding in one pattern, for the common case. It follows the same
+# steps as `parse_binding`, but the lookaheads keep backtracking from finding
+# a match where the step-by-step parser would have failed: `export` can't be
+# given back to become the key, a quote can't start an unquoted key or value,
+# and an unquoted value can't absorb the spaces after `=`. Quoted values stop
+# after the opening quote and are finished by `scan`.
+_binding = make_regex(
+    r"""
+    \s*
+    (?:
+        \Z
+    |
+        (?:export[^\S\r\n]+)?
+        (?!export[^\S\r\n])
+        (?:
+            '(?P<quoted_key>[^']+)'
+        |
+            (?!')(?P<key>[^=\#\s]+)
+        |
+            (?=\#)
+        )
+        [^\S\r\n]*
+        (?:
+            (?P<equals>=)[^\S\r\n]*
+            (?:
+                (?P<quote>['"])
+            |
+                (?![^\S\r\n])(?P<value>[^\r\n]*)
+            )
+        )?
+        (?(quote)|(?:\#[^\r\n]*)?(?:\r\n|\n|\r|$))
+    )
+    """,
+    extra_flags=re.VERBOSE,
+)
+
+_binding_bytes = make_bytes_regex(_binding)
+_binding_tail_bytes = make_bytes_regex(_binding_tail)
+_carriage_return_bytes = re.compile(rb"\r")
+_line_break_bytes = re.compile(rb"\r\n|\n|\r")
+_non_ascii_whitespace_utf8 = re.compile(
+    rb"\xc2[\x85\xa0]|\xe1\x9a\x80|\xe2\x80[\x80-\x8a\xa8\xa9\xaf]|\xe2\x81\x9f|\xe3\x80\x80"
+)
+_utf8_bom = codecs.BOM_UTF8
+_in_place_encodings = {"utf-8": "utf-8", "utf-8-sig": "utf-8", "ascii": "ascii"}
+_in_place_boms = {"utf-8": 1, "utf-8-sig": 2, "ascii": 0}
+
+
+class ClosingQuote:
+    """
+    Finds the quote which ends a quoted value.
+
+    That is the first quote which doesn't follow a backslash or, if there is
+    none, the last quote of the input: the result of matching the value with
+    `'((?:\\'|[^'])*)'`. That pattern is evaluated character by character
+    and backtracks over the whole input when there is no closing quote, so
+    quotes are searched for directly instead, which only costs a `find` per
+    escaped quote. After `max_skips` escaped quotes in a row, the rest is
+    searched with a lookbehind for values full of them, such as JSON.
+    """
+
+    max_skips = 8
+
+    def __init__(self, quote: str) -> None:
+        self.quote = quote
+        # The next quote, the next one which doesn't follow a backslash, and
+        # everything up to the last one.
+        self._patterns = (
+            make_regex(quote),
+            make_regex(r"(?<!\\)" + quote),
+            make_regex(r"(?s).*" + quote),
+        )
+        self._bytes_patterns = tuple(make_bytes_regex(p) for p in self._patterns)
+
+    def find(self, string: Union[str, Buffer], start: int) -> int:
+        """
+        Return the index of the quote which closes the value at `start` of
+        `string`, just after the opening quote, or -1 if there is none.
+        """
+        patterns: Sequence[Pattern[Any]]
+        if isinstance(string, str):
+            backslash: Union[str, bytes] = "\\"
+            patterns = self._patterns
+        else:
+            backslash = b"\\"
+            patterns = self._bytes_patterns
+        quote, unescaped, last = patterns
+        # The patterns match either type, but they can't be typed as such.
+        text = cast(Any, string)
+
+        end = -1
+        skips = 0
+        match = quote.search(text, start)
+        while match is not None:
+            end = match.start()
+            if text[end - 1 : end] != backslash:
+                return end
+            skips += 1
+            if skips == self.max_skips:
+                match = unescaped.search(text, match.end())
+                if match is None:
+                    match = last.match(text, start)
+                assert match is not None
+                return match.end() - 1
+            match = quote.search(text, match.end())
+        return end
 
-class Original(NamedTuple):
-    string: str
-    line: int
+
+_closing_quotes = {"'": ClosingQuote("'"), '"': ClosingQuote('"')}
+_closing_quotes_bytes = {b"'": _closing_quotes["'"], b'"': _closing_quotes['"']}
+
+
+class Original:
+    """
+    Source text of a binding and the line it starts on.
+
+    The parsers create it from offsets into the source they are parsing
+    instead of a copy of the text: `string` is only sliced, and decoded if the
+    source is a byte buffer, when it is first accessed. The source must stay
+    valid until then, which matters for buffers such as `mmap` objects.
+
+    It otherwise behaves like the `(string, line)` named tuple it used to be,
+    except that it isn't a `tuple` instance.
+    """
+
+    __slots__ = ("_source", "_start", "_end", "_encoding", "_string", "line")
+
+    def __init__(self, string: str, line: int) -> None:
+        self._source: Union[str, Buffer, None] = None
+        self._start = 0
+        self._end = len(string)
+        self._encoding = "utf-8"
+        self._string: Optional[str] = string
+        self.line = line
+
+    @classmethod
+    def lazy(
+        cls,
+        source: Union[str, Buffer],
+        start: int,
+        end: int,
+        line: int,
+        encoding: str = "utf-8",
+    ) -> "Original":
+        """Refer to `source[start:end]`, decoded with `encoding` if it is bytes."""
+        original = cls.__new__(cls)
+        original._source = source
+        original._start = start
+        original._end = end
+        original._encoding = encoding
+        original._string = None
+        original.line = line
+        return original
+
+    @property
+    def string(self) -> str:
+        if self._string is None:
+            text = self._source[self._start : self._end]  # type: ignore[index]
+            self._string = text if isinstance(text, str) else str(text, self._encoding)
+            self._source = None
+        return self._string
+
+    @property
+    def length(self) -> int:
+        """Length of `string`, without slicing it unless it has to be decoded."""
+        if self._string is None and isinstance(self._source, str):
+            return self._end - self._start
+        return len(self.string)
+
+    def __iter__(self) -> Iterator[Union[str, int]]:
+        yield self.string
+        yield self.line
+
+    def __getitem__(self, index: Union[int, slice]) -> Any:
+        return (self.string, self.line)[index]
+
+    def __len__(self) -> int:
+        return 2
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, Original):
+            return self.line == other.line and self.string == other.string
+        if isinstance(other, tuple):
+            return (self.string, self.line) == other
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash((self.string, self.line))
+
+    def __repr__(self) -> str:
+        return f"Original(string={self.string!r}, line={self.line!r})"
+
+    def __reduce__(self) -> tuple:
+        return (Original, (self.string, self.line))
 
 
 class Binding(NamedTuple):
@@ -45,21 +275,74 @@ class Binding(NamedTuple):
 
 
 class Position:
-    def __init__(self, chars: int, line: int) -> None:
+    def __init__(self, chars: int) -> None:
         self.chars = chars
-        self.line = line
 
     @classmethod
     def start(cls) -> "Position":
-        return cls(chars=0, line=1)
+        return cls(chars=0)
 
     def set(self, other: "Position") -> None:
         self.chars = other.chars
-        self.line = other.line
 
-    def advance(self, string: str) -> None:
-        self.chars += len(string)
-        self.line += len(re.findall(_newline, string))
+    def advance(self, count: int) -> None:
+        self.chars += count
+
+
+class LineIndex:
+    """
+    Line numbers of offsets into a string.
+
+    The offsets of the line breaks are collected on the first lookup, after
+    which each lookup is a binary search.
+    """
+
+    def __init__(self, string: str, start: int = 1) -> None:
+        self.string = string
+        self.start = start
+        self._breaks: Optional[List[int]] = None
+        self._splits: List[int] = []
+        self._anchor = -1
+        self._anchor_line = 0
+
+    def anchor(self, chars: int, line: int) -> None:
+        """
+        Set the line of `chars`, for callers which already know it.
+
+        Lookups from there on count the line breaks from `chars` instead of
+        building the index.
+        """
+        self._anchor = chars
+        self._anchor_line = line
+
+    def boundary(self, chars: int) -> None:
+        """
+        Note that a binding starts at `chars`.
+
+        Error recovery can stop between the two characters of a `\\r\\n`
+        pair, in which case each of them counts as a line break.
+        """
+        if (
+            self.string.startswith("\n", chars)
+            and self.string[chars - 1 : chars] == "\r"
+        ):
+            if not self._splits or self._splits[-1] < chars:
+                self._splits.append(chars)
+
+    def line(self, chars: int) -> int:
+        if 0 <= self._anchor <= chars:
+            line = self._anchor_line + count_newlines(self.string, self._anchor, chars)
+            if self._splits:
+                line += bisect_right(self._splits, chars) - bisect_right(
+                    self._splits, self._anchor
+                )
+            return line
+        if self._breaks is None:
+            self._breaks = [match.end() for match in _newline.finditer(self.string)]
+        line = bisect_right(self._breaks, chars) + self.start
+        if self._splits:
+            line += bisect_right(self._splits, chars)
+        return line
 
 
 class Error(Exception):
@@ -67,8 +350,9 @@ class Error(Exception):
 
 
 class Reader:
-    def __init__(self, stream: IO[str]) -> None:
-        self.string = stream.read().removeprefix("\ufeff")
+    def __init__(self, string: str, lines: Optional[LineIndex] = None) -> None:
+        self.string = string
+        self.lines = lines if lines is not None else LineIndex(string)
         self.position = Position.start()
         self.mark = Position.start()
 
@@ -77,11 +361,14 @@ class Reader:
 
     def set_mark(self) -> None:
         self.mark.set(self.position)
+        self.lines.boundary(self.mark.chars)
 
     def get_marked(self) -> Original:
-        return Original(
-            string=self.string[self.mark.chars : self.position.chars],
-            line=self.mark.line,
+        return Original.lazy(
+            self.string,
+            self.mark.chars,
+            self.position.chars,
+            self.lines.line(self.mark.chars),
         )
 
     def peek(self, count: int) -> str:
@@ -91,22 +378,38 @@ class Reader:
         result = self.string[self.position.chars : self.position.chars + count]
         if len(result) < count:
             raise Error("read: End of string")
-        self.position.advance(result)
+        self.position.advance(count)
+        return result
+
+    def read_quoted(self) -> str:
+        closing = _closing_quotes[self.peek(1)]
+        end = closing.find(self.string, self.position.chars + 1)
+        if end < 0:
+            raise Error("read_quoted: Closing quote not found")
+        result = self.string[self.position.chars + 1 : end]
+        self.position.chars = end + 1
         return result
 
     def read_regex(self, regex: Pattern[str]) -> Sequence[str]:
         match = regex.match(self.string, self.position.chars)
         if match is None:
             raise Error("read_regex: Pattern not found")
-        self.position.advance(self.string[match.start() : match.end()])
+        self.position.chars = match.end()
         return match.groups()
 
 
 def decode_escapes(regex: Pattern[str], string: str) -> str:
-    def decode_match(match: Match[str]) -> str:
-        return codecs.decode(match.group(0), "unicode-escape")  # type: ignore
+    """
+    Decode the escape sequences matched by `regex` in `string`.
 
-    return regex.sub(decode_match, string)
+    Splitting on `regex` puts the escaped characters at odd indices. Each one
+    decodes to exactly one character, so they can all be translated at once.
+    """
+    if "\\" not in string:
+        return string
+    parts = regex.split(string)
+    parts[1::2] = "".join(parts[1::2]).translate(_escape_table)
+    return "".join(parts)
 
 
 def parse_key(reader: Reader) -> Optional[str]:
@@ -120,19 +423,28 @@ def parse_key(reader: Reader) -> Optional[str]:
     return key
 
 
+def strip_inline_comment(value: str) -> str:
+    # Searching for `\s+#` would retry the whole run of whitespace from each
+    # of its characters. The comment starts at the same place, at the
+    # beginning of the run which ends with `\s#`, which `rstrip` removes.
+    if "#" in value:
+        match = _inline_comment.search(value)
+        if match is not None:
+            value = value[: match.start()]
+    return value.rstrip()
+
+
 def parse_unquoted_value(reader: Reader) -> str:
     (part,) = reader.read_regex(_unquoted_value)
-    return re.sub(r"\s+#.*", "", part).rstrip()
+    return strip_inline_comment(part)
 
 
 def parse_value(reader: Reader) -> str:
     char = reader.peek(1)
     if char == "'":
-        (value,) = reader.read_regex(_single_quoted_value)
-        return decode_escapes(_single_quote_escapes, value)
+        return decode_escapes(_single_quote_escapes, reader.read_quoted())
     elif char == '"':
-        (value,) = reader.read_regex(_double_quoted_value)
-        return decode_escapes(_double_quote_escapes, value)
+        return decode_escapes(_double_quote_escapes, reader.read_quoted())
     elif char in ("", "\n", "\r"):
         return ""
     else:
@@ -176,7 +488,748 @@ def parse_binding(reader: Reader) -> Binding:
         )
 
 
-def parse_stream(stream: IO[str]) -> Iterator[Binding]:
-    reader = Reader(stream)
+def count_newlines(string: str, start: int, end: int) -> int:
+    """Count line breaks in `string[start:end]`, a `\\r\\n` pair counting once."""
+    return (
+        string.count("\n", start, end)
+        + string.count("\r", start, end)
+        - string.count("\r\n", start, end)
+    )
+
+
+def scan(string: str, line: int = 1, keys_only: bool = False) -> Iterator[Binding]:
+    """
+    Tokenize `string` in a single pass over the buffer.
+
+    Most bindings are recognized by one match of `_binding`. Quoted values
+    continue with one match for the value and one for the rest of the line.
+    Anything these patterns reject is handed to `parse_binding`, so malformed
+    input produces exactly the same bindings as the reference parser.
+
+    With `keys_only`, blank lines and comments aren't yielded: only bindings
+    with a key and errors are.
+    """
+    length = len(string)
+    # Line numbers are needed for every binding here, which makes counting
+    # the breaks in each one cheaper than building a `LineIndex`. Files with
+    # LF line endings only need one `count` per binding.
+    lf_only = "\r" not in string
+    binding_match = _binding.match
+    reader: Optional[Reader] = None
+    chars = 0
+
+    while chars < length:
+        end = -1
+        match = binding_match(string, chars)
+        if match is not None:
+            quoted_key, key, _, quote, value = match.groups()
+            if quote is None:
+                end = match.end()
+                if value is not None:
+                    value = strip_inline_comment(value)
+            else:
+                start = match.end()
+                closing = _closing_quotes[quote].find(string, start)
+                if closing >= 0:
+                    tail = _binding_tail.match(string, closing + 1)
+                    if tail is not None:
+                        end = tail.end()
+                        escapes = (
+                            _single_quote_escapes
+                            if quote == "'"
+                            else _double_quote_escapes
+                        )
+                        value = decode_escapes(escapes, string[start:closing])
+
+        if end >= 0:
+            key = key or quoted_key
+            if key is not None or not keys_only:
+                yield Binding(
+                    key, value, Original.lazy(string, chars, end, line), False
+                )
+            if lf_only:
+                line += string.count("\n", chars, end)
+            else:
+                line += count_newlines(string, chars, end)
+            chars = end
+        else:
+            if reader is None:
+                reader = Reader(string)
+            reader.position.chars = chars
+            reader.lines.anchor(chars, line)
+            binding = parse_binding(reader)
+            if binding.key is not None or binding.error or not keys_only:
+                yield binding
+            start, chars = chars, reader.position.chars
+            line += count_newlines(string, start, chars)
+
+
+def split_lines(
+    string: str,
+    universal: bool = True,
+) -> Iterator[Tuple[str, int, int]]:
+    """
+    Yield the text of each line of `string` with its start and end offsets,
+    the latter after the line break.
+
+    Lines end with "\\r\\n", "\\n" or "\\r", or only with "\\n" if `universal` is
+    false.
+    """
+    if universal and "\r" in string:
+        parts = _newline.split(string)
+        texts, breaks = parts[::2], parts[1::2]
+    else:
+        texts = string.split("\n")
+        breaks = ["\n"] * (len(texts) - 1)
+
+    start = 0
+    for text, line_break in zip_longest(texts, breaks, fillvalue=""):
+        end = start + len(text) + len(line_break)
+        if end > start:
+            yield text, start, end
+        start = end
+
+
+def split_simple_line(text: str) -> Tuple[Optional[str], Optional[str], bool]:
+    """
+    Split a line of the "simple" dialect into its key, value and error flag.
+
+    The line is `KEY=VALUE`, split at the first `=`, or `KEY` alone for a key
+    without a value. Nothing is quoted, escaped, exported or commented out.
+    Empty lines have no key and lines starting with `=` are errors.
+    """
+    key, equals, value = text.partition("=")
+    if not key:
+        return None, None, bool(equals)
+    return key, value if equals else None, False
+
+
+def split_docker_line(text: str) -> Tuple[Optional[str], Optional[str], bool]:
+    """
+    Split a line like `docker run --env-file` into its key, value and error
+    flag.
+
+    A trailing "\\r" and leading whitespace are ignored, and lines which are
+    then empty or start with `#` are comments. Other lines are `KEY=VALUE`,
+    split at the first `=`, with the value taken literally, or `KEY` alone.
+    Keys which are empty or contain spaces or tabs are errors.
+    """
+    text = text.removesuffix("\r").lstrip()
+    if not text or text.startswith("#"):
+        return None, None, False
+    key, equals, value = text.partition("=")
+    if not key or " " in key or "\t" in key:
+        return None, None, True
+    return key, value if equals else None, False
+
+
+def scan_lines(
+    string: str,
+    line: int,
+    keys_only: bool,
+    split_line: Callable[[str], Tuple[Optional[str], Optional[str], bool]],
+    universal: bool,
+) -> Iterator[Binding]:
+    for text, start, end in split_lines(string, universal):
+        key, value, error = split_line(text)
+        if key is not None or error or not keys_only:
+            yield Binding(key, value, Original.lazy(string, start, end, line), error)
+        line += 1
+
+
+def scan_simple(
+    string: str, line: int = 1, keys_only: bool = False
+) -> Iterator[Binding]:
+    """
+    Tokenize `string` in the "simple" dialect, see `split_simple_line`.
+    """
+    return scan_lines(string, line, keys_only, split_simple_line, True)
+
+
+def scan_docker(
+    string: str, line: int = 1, keys_only: bool = False
+) -> Iterator[Binding]:
+    """
+    Tokenize `string` like `docker run --env-file`, see `split_docker_line`.
+
+    Lines end with "\\n" or "\\r\\n" but not with "\\r" alone.
+    """
+    return scan_lines(string, line, keys_only, split_docker_line, False)
+
+
+_dialects = {"full": scan, "simple": scan_simple, "docker": scan_docker}
+_line_dialects = {
+    "simple": (split_simple_line, True),
+    "docker": (split_docker_line, False),
+}
+
+
+def get_scanner(dialect: str) -> Callable[[str, int, bool], Iterator[Binding]]:
+    """
+    Return the function which tokenizes a string in `dialect`: "full" (the
+    default), "simple" or "docker".
+    """
+    try:
+        return _dialects[dialect]
+    except KeyError:
+        raise ValueError(f"Unknown dialect: {dialect}") from None
+
+
+class Diagnostic(NamedTuple):
+    """
+    Location of a statement which couldn't be parsed and why.
+
+    `line` and `column` start at 1 and `offset`, in characters from the
+    start of the input, at 0. They point where parsing failed, which is not
+    always where the statement starts.
+    """
+
+    line: int
+    column: int
+    offset: int
+    reason: str
+
+
+def _failure(text: str, dialect: str) -> Tuple[int, str]:
+    # Offset in `text`, the original of an error binding, of the failure.
+    if dialect == "simple":
+        return 0, "missing key"
+    if dialect == "docker":
+        key = text.partition("=")[0]
+        stripped = key.lstrip()
+        if not stripped:
+            return len(key), "missing key"
+        position = min(i for i in (stripped.find(" "), stripped.find("\t")) if i >= 0)
+        return len(key) - len(stripped) + position, "whitespace in key"
+
+    # The same steps as `parse_binding`, noting what each one reads.
+    reader = Reader(text)
+    reason = "missing key"
+    try:
+        reader.read_regex(_multiline_whitespace)
+        reader.read_regex(_export)
+        if reader.peek(1) == "'":
+            reason = "unterminated quoted key"
+        parse_key(reader)
+        reader.read_regex(_whitespace)
+        if reader.peek(1) == "=":
+            reader.read_regex(_equal_sign)
+            reason = "unterminated quoted value"
+            parse_value(reader)
+            reader.read_regex(_whitespace)
+            reason = "unexpected text after value"
+        else:
+            reason = "unexpected text after key"
+        reader.read_regex(_comment)
+        reader.read_regex(_end_of_line)
+    except Error:
+        pass
+    return reader.position.chars, reason
+
+
+def diagnose(binding: Binding, offset: int = 0, dialect: str = "full") -> Diagnostic:
+    """
+    Locate the failure in an error binding produced by the parser for
+    `dialect`, given the `offset` of the binding in the input.
+    """
+    text = binding.original.string
+    chars, reason = _failure(text, dialect)
+    if dialect == "full":
+        start = max(text.rfind("\n", 0, chars), text.rfind("\r", 0, chars)) + 1
+    else:
+        start = 0
+    line = binding.original.line + count_line_breaks(text, 0, start, dialect)
+    return Diagnostic(line, chars - start + 1, offset + chars, reason)
+
+
+def scan_bytes(
+    data: Buffer,
+    encoding: str = "utf-8",
+    keys_only: bool = False,
+) -> Iterator[Binding]:
+    """
+    Tokenize encoded `data` without decoding it as a whole.
+
+    For UTF-8 and ASCII, the bytes are matched in place with the equivalents
+    of the patterns `scan` uses, and only the bindings that are emitted are
+    decoded. Other encodings, data with non-ASCII whitespace and anything
+    after the first binding the fast patterns reject are decoded and passed
+    to `scan`.
+
+    Originals refer to `data`, which must stay valid until they are read.
+    See `scan` for `keys_only`.
+    """
+    name = codecs.lookup(encoding).name
+    if name not in _in_place_encodings or _non_ascii_whitespace_utf8.search(data):
+        yield from scan(str(data, encoding).removeprefix("\ufeff"), keys_only=keys_only)
+        return
+
+    chars = 0
+    # The "utf-8-sig" codec removes a BOM before the one `scan` removes.
+    for _ in range(_in_place_boms[name]):
+        if data[chars : chars + len(_utf8_bom)] == _utf8_bom:
+            chars += len(_utf8_bom)
+
+    encoding = _in_place_encodings[name]
+    length = len(data)
+    binding_match = _binding_bytes.match
+    line = 1
+
+    while chars < length:
+        end = -1
+        value: Optional[str] = None
+        match = binding_match(data, chars)
+        if match is not None:
+            quoted_key, key, _, quote, unquoted = match.groups()
+            if quote is None:
+                end = match.end()
+                if unquoted is not None:
+                    value = strip_inline_comment(str(unquoted, encoding))
+            else:
+                start = match.end()
+                closing = _closing_quotes_bytes[quote].find(data, start)
+                if closing >= 0:
+                    tail = _binding_tail_bytes.match(data, closing + 1)
+                    if tail is not None:
+                        end = tail.end()
+                        escapes = (
+                            _single_quote_escapes
+                            if quote == b"'"
+                            else _double_quote_escapes
+                        )
+                        text = str(data[start:closing], encoding)
+                        value = decode_escapes(escapes, text)
+
+        if end < 0:
+            yield from scan(str(data[chars:], encoding), line, keys_only)
+            return
+
+        key = key or quoted_key
+        if key is not None or not keys_only:
+            yield Binding(
+                None if key is None else str(key, encoding),
+                value,
+                Original.lazy(data, chars, end, line, encoding),
+                False,
+            )
+        line += len(_line_break_bytes.findall(data, chars, end))
+        chars = end
+
+
+def parse_stream_reference(stream: IO[str]) -> Iterator[Binding]:
+    """
+    Parse `stream` one token at a time with `Reader`.
+
+    This is the straightforward implementation of the grammar. It is slower
+    than `parse_stream` but is kept as the specification the latter is tested
+    against.
+    """
+    reader = Reader(stream.read().removeprefix("\ufeff"))
     while reader.has_next():
         yield parse_binding(reader)
+
+
+# Text appended to pending input by `StreamParser` to find out which of its
+# bindings are complete.
+_PROBE = "\n'\"\n"
+
+
+def count_line_breaks(string: str, start: int, end: int, dialect: str) -> int:
+    """Count line breaks in `string[start:end]` as `dialect` splits lines."""
+    if dialect == "docker":
+        return string.count("\n", start, end)
+    return count_newlines(string, start, end)
+
+
+def parse_complete(
+    text: str,
+    line: int,
+    final: bool,
+    keys_only: bool = False,
+    dialect: str = "full",
+) -> Tuple[List[Binding], int, int]:
+    """
+    Parse the bindings at the beginning of `text` which are complete, that is
+    which the text that may follow can't change, or all of them if `final`.
+
+    Returns the bindings, the number of characters they cover, and the number
+    of the line after them, `text` starting at line `line`.
+    """
+    scan = get_scanner(dialect)
+    bindings: List[Binding] = []
+    last: Optional[Original] = None
+    start = chars = 0
+    for binding in scan(text if final else text + _PROBE, line, False):
+        end = chars + binding.original.length
+        if end > len(text):
+            break
+        if binding.key is not None or binding.error or not keys_only:
+            bindings.append(binding)
+        last = binding.original
+        start, chars = chars, end
+
+    if last is not None:
+        line = last.line + count_line_breaks(text, start, chars, dialect)
+    return bindings, chars, line
+
+
+class StreamParser:
+    """
+    Incremental parser: text is passed in chunks with `feed` and bindings are
+    returned as soon as they are complete.
+
+    A binding is complete when the text that follows can't change how it is
+    parsed. To find out, the pending text is parsed with `_PROBE` appended:
+    it ends lines and closes quoted keys and values, so any binding which
+    depends on what comes next extends into it and is held back.
+
+    Only the pending text is kept in memory. Bindings end after a line
+    break, so it is only parsed again when a chunk brings one, or follows a
+    "\r" which may have been the start of "\r\n". Once it is longer than
+    `eager_size`, it is parsed again when its size has doubled rather than on
+    every such chunk, which keeps the total cost linear.
+
+    `close` must be called at the end of the input to get the last bindings.
+    See `scan` for `keys_only` and `get_scanner` for `dialect`.
+    """
+
+    eager_size = 4 * 1024
+
+    def __init__(self, keys_only: bool = False, dialect: str = "full") -> None:
+        get_scanner(dialect)
+        self.keys_only = keys_only
+        self.dialect = dialect
+        self._chunks: List[str] = []
+        self._size = 0
+        self._retry_size = 0
+        self._carriage_return = False
+        self._line = 1
+        self._started = False
+        self._closed = False
+
+    def feed(self, chunk: str) -> List[Binding]:
+        if self._closed:
+            raise ValueError("Can't feed a closed parser")
+        if not self._started and chunk:
+            chunk = chunk.removeprefix("\ufeff")
+            self._started = True
+        completes = self._carriage_return or "\n" in chunk or "\r" in chunk
+        if chunk:
+            self._carriage_return = chunk.endswith("\r")
+        self._chunks.append(chunk)
+        self._size += len(chunk)
+        if not completes or self._size < self._retry_size:
+            return []
+        return self._parse(final=False)
+
+    def close(self) -> List[Binding]:
+        if self._closed:
+            return []
+        self._closed = True
+        return self._parse(final=True)
+
+    def _parse(self, final: bool) -> List[Binding]:
+        pending = "".join(self._chunks)
+        bindings, chars, self._line = parse_complete(
+            pending, self._line, final, self.keys_only, self.dialect
+        )
+        rest = pending[chars:]
+        self._chunks = [rest] if rest else []
+        self._size = len(rest)
+        self._retry_size = 2 * len(rest) if len(rest) > self.eager_size else 0
+        return bindings
+
+
+def parse_stream(
+    stream: IO[str],
+    chunk_size: Optional[int] = None,
+    keys_only: bool = False,
+    dialect: str = "full",
+) -> Iterator[Binding]:
+    """
+    Parse the .env content of `stream`.
+
+    By default the whole stream is read before parsing. With `chunk_size`,
+    it is read in chunks of that many characters instead, so that memory use
+    depends on the size of the largest binding rather than that of the input.
+
+    With `keys_only`, blank lines and comments are skipped. `dialect` selects
+    the syntax, see `get_scanner`.
+    """
+    scan = get_scanner(dialect)
+    if chunk_size is None:
+        yield from scan(stream.read().removeprefix("\ufeff"), 1, keys_only)
+        return
+
+    parser = StreamParser(keys_only, dialect)
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        yield from parser.feed(chunk)
+    yield from parser.close()
+
+
+def parse_string(
+    string: str,
+    keys_only: bool = False,
+    dialect: str = "full",
+    workers: Optional[int] = None,
+) -> Iterator[Binding]:
+    """
+    Parse the .env content of `string`.
+
+    This is equivalent to `parse_stream(io.StringIO(string))`, without the
+    stream. With `workers`, `string` is parsed by `parse_parallel`.
+    """
+    if workers is not None:
+        yield from parse_parallel(string, workers, keys_only, dialect)
+        return
+
+    scan = get_scanner(dialect)
+    yield from scan(string.removeprefix("\ufeff"), 1, keys_only)
+
+
+# Where `parse_parallel` can split its input: the start of a line which
+# doesn't start with whitespace and follows a line which doesn't end with
+# any, as `scan` attaches the blank lines before a binding to it.
+_split_point = make_regex(r"\S[^\S\r\n]*\r?\n(?=\S)")
+
+# Bindings sent back by the workers of `parse_parallel`, as columns: keys,
+# values, error flags, and the start, end and line of their original text.
+# Pickling lists of strings and integers is much faster than pickling
+# `Binding` objects, and the originals can refer to the parent's copy of the
+# text again.
+_Columns = Tuple[
+    List[Optional[str]],
+    List[Optional[str]],
+    List[bool],
+    List[int],
+    List[int],
+    List[int],
+]
+
+
+def _to_columns(
+    bindings: List[Binding], offset: int, keys_only: bool
+) -> Tuple[_Columns, int]:
+    keys: List[Optional[str]] = []
+    values: List[Optional[str]] = []
+    errors: List[bool] = []
+    starts: List[int] = []
+    ends: List[int] = []
+    lines: List[int] = []
+    end = offset
+    for binding in bindings:
+        start, end = end, end + binding.original.length
+        if binding.key is not None or binding.error or not keys_only:
+            keys.append(binding.key)
+            values.append(binding.value)
+            errors.append(binding.error)
+            starts.append(start)
+            ends.append(end)
+            lines.append(binding.original.line)
+    return (keys, values, errors, starts, ends, lines), end
+
+
+def _parse_chunk(
+    arguments: Tuple[str, int, int, bool, bool, str],
+) -> Tuple[_Columns, int, int]:
+    text, offset, line, final, keys_only, dialect = arguments
+    bindings, _, line = parse_complete(text, line, final, False, dialect)
+    columns, end = _to_columns(bindings, offset, keys_only)
+    return columns, end, line
+
+
+def _parse_columns(
+    string: str, workers: int, keys_only: bool, dialect: str
+) -> Iterator[_Columns]:
+    from concurrent.futures import ProcessPoolExecutor
+
+    get_scanner(dialect)
+    if workers < 1:
+        raise ValueError("workers must be at least 1")
+
+    starts = [0]
+    size = len(string) // workers
+    for index in range(1, workers):
+        match = _split_point.search(string, max(index * size, starts[-1]))
+        if match is None:
+            break
+        starts.append(match.end())
+    ends = starts[1:] + [len(string)]
+    lines = [1]
+    for start, end in zip(starts[:-1], ends[:-1], strict=True):
+        lines.append(lines[-1] + count_line_breaks(string, start, end, dialect))
+
+    arguments = [
+        (string[start:end], start, line, end == len(string), keys_only, dialect)
+        for start, end, line in zip(starts, ends, lines, strict=True)
+    ]
+    if len(arguments) == 1:
+        results = [_parse_chunk(arguments[0])]
+    else:
+        with ProcessPoolExecutor(len(arguments)) as executor:
+            results = list(executor.map(_parse_chunk, arguments))
+
+    scan = get_scanner(dialect)
+    position = 0
+    line = 1
+    for start, end, first_line, (columns, covered, next_line) in zip(
+        starts, ends, lines, results, strict=True
+    ):
+        if position == start:
+            # The first lines of the chunks were counted before parsing, with
+            # each "\r\n" as one line break, but error recovery may have split
+            # one in two, which the scan counts as two.
+            shift = line - first_line
+            if shift:
+                columns[5][:] = [number + shift for number in columns[5]]
+            yield columns
+            position, line = covered, next_line + shift
+        if position >= end:
+            continue
+        # A binding crosses the end of the chunk, or the chunk didn't start
+        # at a binding: parse again from the last binding until past its end.
+        rest = string[position:]
+        bindings: List[Binding] = []
+        length = 0
+        for binding in scan(rest, line, False):
+            bindings.append(binding)
+            length += binding.original.length
+            if position + length >= end:
+                break
+        if bindings:
+            last = bindings[-1].original
+            line = last.line + count_line_breaks(
+                rest, length - last.length, length, dialect
+            )
+        columns, position = _to_columns(bindings, position, keys_only)
+        yield columns
+
+
+def parse_parallel(
+    string: str,
+    workers: int,
+    keys_only: bool = False,
+    dialect: str = "full",
+) -> Iterator[Binding]:
+    """
+    Parse the .env content of `string` in up to `workers` chunks in parallel,
+    with a process pool.
+
+    The chunks start at lines which most likely start a binding. Each one is
+    parsed with `parse_complete`, which returns the bindings that lie entirely
+    within it. A chunk's bindings are only used if the previous ones ended
+    exactly where it starts. Otherwise, e.g. if it started within a multiline
+    value, the text is parsed again from the end of the last binding until
+    the end of the chunk is reached. The result is the same as that of
+    `parse_string`, line numbers included.
+
+    This only pays off for large inputs and with several CPUs. The worker
+    processes import this module, so on platforms which spawn them, the
+    calling script must be guarded by `if __name__ == "__main__"`.
+    """
+    string = string.removeprefix("\ufeff")
+    for keys, values, errors, starts, ends, lines in _parse_columns(
+        string, workers, keys_only, dialect
+    ):
+        for key, value, error, start, end, line in zip(
+            keys, values, errors, starts, ends, lines, strict=True
+        ):
+            yield Binding(key, value, Original.lazy(string, start, end, line), error)
+
+
+def parse_pairs_parallel(
+    string: str,
+    workers: int,
+    dialect: str = "full",
+) -> Iterator[Tuple[Optional[str], Optional[str], int]]:
+    """
+    Parse the .env content of `string` like `parse_parallel` with `keys_only`,
+    but yield the same tuples as `parse_pairs` instead of bindings.
+    """
+    string = string.removeprefix("\ufeff")
+    for keys, values, _, _, _, lines in _parse_columns(string, workers, True, dialect):
+        yield from zip(keys, values, lines, strict=True)
+
+
+def parse_bytes(
+    data: Buffer,
+    encoding: str = "utf-8",
+    keys_only: bool = False,
+    dialect: str = "full",
+) -> Iterator[Binding]:
+    """
+    Parse the .env content of `data`, encoded with `encoding`.
+
+    The result is the same as reading `data` from a file opened in text mode
+    with `encoding`: line endings are translated to "\\n". In the full
+    dialect, data without "\\r" is parsed in place by `scan_bytes`.
+    """
+    if dialect == "full" and _carriage_return_bytes.search(data) is None:
+        yield from scan_bytes(data, encoding, keys_only)
+        return
+
+    string = str(data, encoding).replace("\r\n", "\n").replace("\r", "\n")
+    yield from parse_string(string, keys_only, dialect)
+
+
+def parse_pairs(
+    stream: IO[str],
+    chunk_size: Optional[int] = None,
+    dialect: str = "simple",
+    line: int = 1,
+) -> Iterator[Tuple[Optional[str], Optional[str], int]]:
+    """
+    Parse the .env content of `stream` in a line-based dialect: "simple" or
+    "docker".
+
+    This yields `(key, value, line)` for each binding with a key and
+    `(None, None, line)` for each error, which is what loading needs from
+    `parse_stream` with `keys_only`, without building bindings. `chunk_size`
+    is as for `parse_stream`. The content starts at line `line`, and a byte
+    order mark is only removed at line 1.
+    """
+    try:
+        split_line, universal = _line_dialects[dialect]
+    except KeyError:
+        get_scanner(dialect)
+        raise ValueError(f"Dialect {dialect} isn't line-based") from None
+
+    pending: List[str] = []
+    first = line == 1
+    while True:
+        chunk = stream.read(-1 if chunk_size is None else chunk_size)
+        if first and chunk:
+            first = False
+            chunk = chunk.removeprefix("\ufeff")
+            if not chunk:
+                continue
+        if chunk:
+            # Only whole lines are split, so that "\r\n" is never cut in two.
+            end = chunk.rfind("\n") + 1
+            if not end:
+                pending.append(chunk)
+                continue
+            pending.append(chunk[:end])
+            text = "".join(pending)
+            pending = [chunk[end:]]
+        else:
+            text = "".join(pending)
+        if universal and "\r" in text:
+            texts = _newline.split(text)[::2]
+        else:
+            texts = text.split("\n")
+        # Unless the input has ended, `text` ends with a line break and the
+        # empty string after it isn't a line.
+        last = texts.pop()
+        if not chunk:
+            texts.append(last)
+        for number, text in enumerate(texts, line):
+            key, value, error = split_line(text)
+            if key is not None or error:
+                yield key, value, number
+        line += len(texts)
+        if not chunk:
+            return
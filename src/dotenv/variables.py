@@ -1,21 +1,27 @@
+import functools
 import re
 from abc import ABCMeta, abstractmethod
-from typing import Iterator, Mapping, Optional, Pattern
-
-_posix_variable: Pattern[str] = re.compile(
-    r"""
-    \$\{
-        (?P<name>[^\}:]*)
-        (?::-
-            (?P<default>[^\}]*)
-        )?
-    \}
-    """,
-    re.VERBOSE,
+from typing import (
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Pattern,
+    Tuple,
 )
 
+# The end of the name of a variable in `${name}` or `${name:-default}`.
+_name_end: Pattern[str] = re.compile(r"[:}]")
+
+# How many expressions can be nested in the default of another by default.
+MAX_DEPTH = 8
+
 
 class Atom(metaclass=ABCMeta):
+    __slots__ = ()
+
     def __ne__(self, other: object) -> bool:
         result = self.__eq__(other)
         if result is NotImplemented:
@@ -27,6 +33,8 @@ class Atom(metaclass=ABCMeta):
 
 
 class Literal(Atom):
+    __slots__ = ("value",)
+
     def __init__(self, value: str) -> None:
         self.value = value
 
@@ -46,9 +54,22 @@ class Literal(Atom):
 
 
 class Variable(Atom):
-    def __init__(self, name: str, default: Optional[str]) -> None:
+    """
+    A `${name}` or `${name:-default}` expression. `default` is the text of the
+    default, and `atoms` its atoms if it contains other expressions.
+    """
+
+    __slots__ = ("name", "default", "atoms")
+
+    def __init__(
+        self,
+        name: str,
+        default: Optional[str],
+        atoms: Optional[Tuple[Atom, ...]] = None,
+    ) -> None:
         self.name = name
         self.default = default
+        self.atoms = atoms
 
     def __repr__(self) -> str:
         return f"Variable(name={self.name}, default={self.default})"
@@ -62,25 +83,183 @@ class Variable(Atom):
         return hash((self.__class__, self.name, self.default))
 
     def resolve(self, env: Mapping[str, Optional[str]]) -> str:
-        default = self.default if self.default is not None else ""
-        result = env.get(self.name, default)
-        return result if result is not None else ""
+        if self.atoms is None:
+            default = self.default if self.default is not None else ""
+            result = env.get(self.name, default)
+            return result if result is not None else ""
+        if self.name in env:
+            return env[self.name] or ""
+        return "".join([atom.resolve(env) for atom in self.atoms])
 
 
-def parse_variables(value: str) -> Iterator[Atom]:
-    cursor = 0
+class _Frame(NamedTuple):
+    # A `${name:-` expression whose default is being scanned.
+    start: int
+    name: str
+    default_start: int
+    parent: List[Atom]
 
-    for match in _posix_variable.finditer(value):
-        (start, end) = match.span()
-        name = match["name"]
-        default = match["default"]
 
-        if start > cursor:
-            yield Literal(value=value[cursor:start])
+def parse_variables(value: str, max_depth: int = MAX_DEPTH) -> Iterator[Atom]:
+    """
+    Split `value` into literals and `${name}` or `${name:-default}` variables.
 
-        yield Variable(name=name, default=default)
-        cursor = end
+    Names can't contain `:` or `}`. Defaults end at the first `}` which doesn't
+    close an expression nested in them, as in `${A:-${B:-x}}`, up to
+    `max_depth` levels: deeper, `${` is part of the text of the default.
 
+    The value is scanned once, with a stack of the expressions whose default
+    is open. The positions of the next `${` and `}` and of the end of the last
+    name are kept until the scan passes them, and an expression whose name
+    doesn't end with `}` or `:-` is skipped with the `${` it contains, so the
+    time is linear whatever the nesting. When the value ends with defaults
+    still open, their text is kept as literals around the expressions closed
+    in them.
+    """
     length = len(value)
+    atoms: List[Atom] = []
+    frames: List[_Frame] = []
+    position = cursor = 0
+    name_end = -1
+    # The next `${` and `}` from `position`, -1 if there are none.
+    next_open = value.find("${")
+    next_close = -2
+
+    while True:
+        if next_open != -1 and next_open < position:
+            next_open = value.find("${", position)
+        if frames:
+            if next_close != -1 and next_close < position:
+                next_close = value.find("}", position)
+            can_nest = next_open >= 0 and len(frames) <= max_depth
+            if next_close >= 0 and (not can_nest or next_close < next_open):
+                if next_close > cursor:
+                    atoms.append(Literal(value=value[cursor:next_close]))
+                frame = frames.pop()
+                nested = any(isinstance(atom, Variable) for atom in atoms)
+                variable = Variable(
+                    name=frame.name,
+                    default=value[frame.default_start : next_close],
+                    atoms=tuple(atoms) if nested else None,
+                )
+                atoms = frame.parent
+                atoms.append(variable)
+                position = cursor = next_close + 1
+                continue
+            if not can_nest:
+                break
+        elif next_open < 0:
+            break
+
+        start = next_open
+        if name_end < start + 2:
+            match = _name_end.search(value, start + 2)
+            name_end = length if match is None else match.start()
+
+        if value.startswith("}", name_end):
+            if start > cursor:
+                atoms.append(Literal(value=value[cursor:start]))
+            atoms.append(Variable(name=value[start + 2 : name_end], default=None))
+            position = cursor = name_end + 1
+        elif value.startswith(":-", name_end):
+            if start > cursor:
+                atoms.append(Literal(value=value[cursor:start]))
+            position = cursor = name_end + 2
+            if next_open != -1 and next_open < position:
+                next_open = value.find("${", position)
+            if next_close != -1 and next_close < position:
+                next_close = value.find("}", position)
+            if next_close >= 0 and (
+                len(frames) >= max_depth or next_open < 0 or next_close < next_open
+            ):
+                # Most defaults don't contain expressions.
+                atoms.append(
+                    Variable(
+                        name=value[start + 2 : name_end],
+                        default=value[position:next_close],
+                    )
+                )
+                position = cursor = next_close + 1
+            else:
+                frames.append(
+                    _Frame(start, value[start + 2 : name_end], position, atoms)
+                )
+                atoms = []
+        else:
+            # Any `${` before the end of this name is followed by the same
+            # invalid end, so the whole text is literal.
+            position = name_end
+
     if cursor < length:
-        yield Literal(value=value[cursor:length])
+        atoms.append(Literal(value=value[cursor:length]))
+    if frames:
+        # The defaults still open are unclosed, and so are the expressions
+        # around them: only the expressions closed in them remain.
+        parts = frames[0].parent
+        for index, frame in enumerate(frames):
+            parts.append(Literal(value=value[frame.start : frame.default_start]))
+            parts.extend(frames[index + 1].parent if index + 1 < len(frames) else atoms)
+        atoms = list(_join_literals(parts))
+    return iter(atoms)
+
+
+def _join_literals(atoms: Iterable[Atom]) -> Iterator[Atom]:
+    text: List[str] = []
+    for atom in atoms:
+        if isinstance(atom, Literal):
+            text.append(atom.value)
+            continue
+        if text:
+            yield Literal(value="".join(text))
+            text = []
+        yield atom
+    if text:
+        yield Literal(value="".join(text))
+
+
+class Template:
+    """
+    A value split into its atoms once, to be interpolated any number of times.
+
+    `names` are the names of the variables it refers to, in order. A value
+    without `${` isn't parsed, and `substitute` returns it as it is.
+    """
+
+    __slots__ = ("source", "atoms", "names")
+
+    def __init__(self, source: str, max_depth: int = MAX_DEPTH) -> None:
+        self.source = source
+        self.atoms: Tuple[Atom, ...]
+        if "${" in source:
+            self.atoms = tuple(parse_variables(source, max_depth))
+        else:
+            self.atoms = (Literal(source),) if source else ()
+        self.names: Tuple[str, ...] = tuple(_names(self.atoms))
+
+    def __repr__(self) -> str:
+        return f"Template(source={self.source!r})"
+
+    def substitute(self, env: Mapping[str, Optional[str]]) -> str:
+        if not self.names:
+            return self.source
+        return "".join([atom.resolve(env) for atom in self.atoms])
+
+
+def _names(atoms: Iterable[Atom]) -> Iterator[str]:
+    # The names of the variables, including those in defaults.
+    for atom in atoms:
+        if isinstance(atom, Variable):
+            yield atom.name
+            if atom.atoms is not None:
+                yield from _names(atom.atoms)
+
+
+@functools.lru_cache(maxsize=1024)
+def compile_template(value: str, max_depth: int = MAX_DEPTH) -> Template:
+    """
+    Return the template of `value`, from a cache of the most recently compiled
+    ones, so that the values of a file loaded again aren't parsed again.
+
+    Templates are shared, and must not be modified.
+    """
+    return Template(value, max_depth)
@@ -2,6 +2,23 @@ import pytest
 from click.testing import CliRunner
 
 
+def pytest_addoption(parser):
+    parser.addoption(
+        "--worst-case",
+        action="store_true",
+        help="run the timing checks of worst-case inputs",
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--worst-case"):
+        return
+    skip = pytest.mark.skip(reason="timing check, run with --worst-case")
+    for item in items:
+        if "worst_case" in item.keywords:
+            item.add_marker(skip)
+
+
 @pytest.fixture
 def cli():
     runner = CliRunner()
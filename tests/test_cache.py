@@ -0,0 +1,205 @@
+import io
+import os
+import stat
+import sys
+from unittest import mock
+
+import pytest
+
+import dotenv
+from dotenv.cache import CacheInfo, ParseCache, cache_dir, parse_cache
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    dotenv.cache_clear()
+    yield
+    dotenv.cache_clear()
+
+
+@mock.patch.dict(os.environ, {}, clear=True)
+def test_dotenv_values_cache(dotenv_path):
+    dotenv_path.write_text("a=b\nc=${a}${d}")
+
+    first = dotenv.dotenv_values(dotenv_path, cache=True)
+    with mock.patch("dotenv.main.DotEnv._parse") as mock_parse:
+        os.environ["d"] = "e"
+        second = dotenv.dotenv_values(dotenv_path, cache=True)
+
+    assert first == {"a": "b", "c": "b"}
+    assert second == {"a": "b", "c": "be"}
+    mock_parse.assert_not_called()
+    assert dotenv.cache_info() == CacheInfo(hits=1, misses=1, maxsize=32, currsize=1)
+
+
+def test_dotenv_values_cache_hit_stats_once(dotenv_path):
+    dotenv_path.write_text("a=b")
+    dotenv.dotenv_values(dotenv_path, cache=True)
+
+    with mock.patch("os.stat", wraps=os.stat) as mock_stat:
+        result = dotenv.dotenv_values(dotenv_path, cache=True)
+
+    assert result == {"a": "b"}
+    mock_stat.assert_called_once()
+
+
+def test_dotenv_cache_is_stale(dotenv_path):
+    dotenv_path.write_text("a=b")
+    env = dotenv.main.DotEnv(dotenv_path, cache=True)
+    env.dict()
+
+    assert not env.is_stale()
+    dotenv_path.write_text("a=cd")
+    assert env.is_stale()
+
+
+def test_dotenv_values_cache_changed_file(dotenv_path):
+    dotenv_path.write_text("a=b")
+    dotenv.dotenv_values(dotenv_path, cache=True)
+
+    dotenv_path.write_text("a=cd")
+    result = dotenv.dotenv_values(dotenv_path, cache=True)
+
+    assert result == {"a": "cd"}
+    assert dotenv.cache_info() == CacheInfo(hits=0, misses=2, maxsize=32, currsize=2)
+
+
+def test_dotenv_values_cache_options(dotenv_path):
+    dotenv_path.write_text("a b=c")
+
+    full = dotenv.dotenv_values(dotenv_path, cache=True)
+    simple = dotenv.dotenv_values(dotenv_path, cache=True, dialect="simple")
+    latin = dotenv.dotenv_values(dotenv_path, cache=True, encoding="latin-1")
+
+    assert full == latin == {}
+    assert simple == {"a b": "c"}
+    assert dotenv.cache_info().misses == 3
+
+
+def test_dotenv_values_without_cache(dotenv_path):
+    dotenv_path.write_text("a=b")
+
+    dotenv.dotenv_values(dotenv_path)
+    dotenv.dotenv_values(stream=io.StringIO("a=b"), cache=True)
+
+    assert dotenv.cache_info() == CacheInfo(hits=0, misses=0, maxsize=32, currsize=0)
+
+
+def test_load_dotenv_cache(dotenv_path):
+    dotenv_path.write_text("a=b")
+
+    with mock.patch.dict(os.environ, {}, clear=True):
+        dotenv.load_dotenv(dotenv_path, cache=True)
+        dotenv.load_dotenv(dotenv_path, cache=True)
+        assert os.environ == {"a": "b"}
+
+    assert dotenv.cache_info().hits == 1
+
+
+def test_parse_cache_evicts_least_recently_used(tmp_path):
+    cache = ParseCache(maxsize=2)
+    keys = []
+    for name in "abc":
+        path = tmp_path / name
+        path.write_text(name)
+        key = ParseCache.key(path, "utf-8", "full")
+        assert key is not None
+        keys.append(key)
+
+    cache.put(keys[0], (("a", "1"),))
+    cache.put(keys[1], (("b", "2"),))
+    cache.get(keys[0])
+    cache.put(keys[2], (("c", "3"),))
+
+    assert cache.get(keys[0]) == (("a", "1"),)
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[2]) == (("c", "3"),)
+    assert cache.info() == CacheInfo(hits=3, misses=1, maxsize=2, currsize=2)
+
+
+@pytest.mark.skipif(
+    sys.platform == "win32", reason="symlinks require elevated privileges on Windows"
+)
+def test_parse_cache_key(tmp_path):
+    path = tmp_path / ".env"
+    path.write_text("a=b")
+    link = tmp_path / "link"
+    link.symlink_to(path)
+
+    assert ParseCache.key(link, None, "full") == ParseCache.key(path, None, "full")
+    assert ParseCache.key(tmp_path, None, "full") is None
+    assert ParseCache.key(tmp_path / "missing", None, "full") is None
+
+
+def test_cache_clear(dotenv_path):
+    dotenv.dotenv_values(dotenv_path, cache=True)
+
+    dotenv.cache_clear()
+
+    assert parse_cache.info() == CacheInfo(hits=0, misses=0, maxsize=32, currsize=0)
+
+
+@pytest.fixture
+def disk_cache_dir(tmp_path, monkeypatch):
+    directory = tmp_path / "cache"
+    monkeypatch.setenv("PYTHON_DOTENV_CACHE_DIR", str(directory))
+    yield directory
+
+
+def test_dotenv_values_disk_cache(dotenv_path, disk_cache_dir):
+    dotenv_path.write_bytes(b"\xef\xbb\xbfa=b\r\nc='d\r\ne'\nf=${a}")
+
+    first = dotenv.dotenv_values(dotenv_path, disk_cache=True)
+    with mock.patch("dotenv.main.DotEnv._parse_data") as mock_parse:
+        second = dotenv.dotenv_values(dotenv_path, disk_cache=True)
+
+    assert first == second == dotenv.dotenv_values(dotenv_path)
+    mock_parse.assert_not_called()
+    (entry,) = disk_cache_dir.iterdir()
+    if sys.platform != "win32":
+        assert stat.S_IMODE(disk_cache_dir.stat().st_mode) == 0o700
+        assert stat.S_IMODE(entry.stat().st_mode) == 0o600
+
+
+def test_dotenv_values_disk_cache_changed_file(dotenv_path, disk_cache_dir):
+    dotenv_path.write_text("a=b")
+    dotenv.dotenv_values(dotenv_path, disk_cache=True)
+    path_stat = dotenv_path.stat()
+
+    # Same size and modification time, different content.
+    dotenv_path.write_text("a=c")
+    os.utime(dotenv_path, ns=(path_stat.st_atime_ns, path_stat.st_mtime_ns))
+    result = dotenv.dotenv_values(dotenv_path, disk_cache=True)
+
+    assert result == {"a": "c"}
+
+
+def test_dotenv_values_disk_cache_invalid_entry(dotenv_path, disk_cache_dir):
+    dotenv_path.write_text("a=b")
+    dotenv.dotenv_values(dotenv_path, disk_cache=True)
+    (entry,) = disk_cache_dir.iterdir()
+    entry.write_bytes(b"garbage")
+
+    result = dotenv.dotenv_values(dotenv_path, disk_cache=True)
+
+    assert result == {"a": "b"}
+    assert entry.read_bytes() != b"garbage"
+
+
+def test_dotenv_values_disk_cache_unwritable(dotenv_path, tmp_path, monkeypatch):
+    (tmp_path / "file").write_text("")
+    monkeypatch.setenv("PYTHON_DOTENV_CACHE_DIR", str(tmp_path / "file" / "cache"))
+    dotenv_path.write_text("a=b")
+
+    assert dotenv.dotenv_values(dotenv_path, disk_cache=True) == {"a": "b"}
+
+
+def test_cache_dir(monkeypatch):
+    monkeypatch.delenv("PYTHON_DOTENV_CACHE_DIR", raising=False)
+    monkeypatch.setenv("XDG_CACHE_HOME", os.path.join("home", "cache"))
+
+    assert cache_dir() == os.path.join("home", "cache", "python-dotenv")
+
+    monkeypatch.setenv("PYTHON_DOTENV_CACHE_DIR", "dir")
+
+    assert cache_dir() == "dir"
@@ -1,3 +1,4 @@
+import io
 import os
 from pathlib import Path
 from typing import Optional
@@ -87,6 +88,30 @@ def test_get_not_a_file(cli):
     assert "Error opening env file" in result.output
 
 
+def test_get_with_index(cli, dotenv_path):
+    dotenv_path.write_text("a=b\nc=${a}")
+
+    index_result = cli.invoke(dotenv_cli, ["--file", dotenv_path, "index"])
+    results = [
+        cli.invoke(dotenv_cli, ["--file", dotenv_path, "get", key]) for key in "acd"
+    ]
+
+    assert index_result.exit_code == 0, index_result.output
+    assert os.path.exists(f"{dotenv_path}.idx")
+    assert [(result.exit_code, result.output) for result in results] == [
+        (0, "b\n"),
+        (0, "b\n"),
+        (1, ""),
+    ]
+
+
+def test_index_non_existent_file(cli):
+    result = cli.invoke(dotenv_cli, ["--file", "nx_file", "index"])
+
+    assert result.exit_code == 2
+    assert "Error opening env file" in result.output
+
+
 def test_unset_existing_value(cli, dotenv_path):
     dotenv_path.write_text("a=b")
 
@@ -211,6 +236,71 @@ def test_run_with_existing_variable_not_overridden(tmp_path):
     check_process(result, exit_code=0, stdout="C\n")
 
 
+def test_hash(cli, dotenv_path):
+    dotenv_path.write_text("a=b # c\n\nd='${a}'")
+
+    result = cli.invoke(dotenv_cli, ["--file", str(dotenv_path), "hash"])
+    interpolated = cli.invoke(
+        dotenv_cli, ["--file", str(dotenv_path), "hash", "--interpolate"]
+    )
+
+    assert (result.exit_code, result.output) == (
+        0,
+        dotenv.fingerprint(stream=io.StringIO("a=b\nd=${a}")) + "\n",
+    )
+    assert (interpolated.exit_code, interpolated.output) == (
+        0,
+        dotenv.fingerprint(stream=io.StringIO("a=b\nd=b")) + "\n",
+    )
+
+
+def test_hash_non_existent_file(cli):
+    result = cli.invoke(dotenv_cli, ["--file", "nx_file", "hash"])
+
+    assert result.exit_code == 2, result.output
+    assert "Error opening env file" in result.output
+
+
+def test_freeze(cli, dotenv_path, tmp_path):
+    dotenv_path.write_text("a=b\nc=${a}")
+    module_path = tmp_path / "frozen_env.py"
+
+    result = cli.invoke(
+        dotenv_cli,
+        ["--file", str(dotenv_path), "freeze", "--no-interpolate", str(module_path)],
+    )
+
+    assert (result.exit_code, result.output) == (
+        0,
+        f"Froze 2 variables from {dotenv_path} in {module_path}\n",
+    )
+    namespace: dict = {}
+    exec(module_path.read_text(), namespace)
+    assert namespace["VALUES"] == {"a": "b", "c": "${a}"}
+    assert namespace["INTERPOLATED"] is False
+
+
+def test_freeze_non_existent_file(cli, tmp_path):
+    result = cli.invoke(dotenv_cli, ["--file", "nx_file", "freeze", "frozen_env.py"])
+
+    assert result.exit_code == 2, result.output
+    assert "Error freezing env file:" in result.output
+
+
+def test_run_with_cache(tmp_path):
+    (tmp_path / ".env").write_text("A=x")
+    env = dict(os.environ)
+    env["PYTHON_DOTENV_CACHE_DIR"] = str(tmp_path / "cache")
+
+    first = run_dotenv(["run", "--cache", "printenv", "A"], cwd=tmp_path, env=env)
+    (tmp_path / ".env").write_text("A=yz")
+    second = run_dotenv(["run", "--cache", "printenv", "A"], cwd=tmp_path, env=env)
+
+    check_process(first, exit_code=0, stdout="x\n")
+    check_process(second, exit_code=0, stdout="yz\n")
+    assert len(list((tmp_path / "cache").iterdir())) == 1
+
+
 def test_run_with_none_value(tmp_path):
     (tmp_path / ".env").write_text("A=x\nc")
 
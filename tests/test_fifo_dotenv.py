@@ -5,7 +5,7 @@ import threading
 
 import pytest
 
-from dotenv import load_dotenv
+from dotenv import dotenv_values, load_dotenv
 
 pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="FIFOs are Unix-only")
 
@@ -29,3 +29,20 @@ def test_load_dotenv_from_fifo(tmp_path: pathlib.Path, monkeypatch):
 
     assert ok is True
     assert os.getenv("MY_PASSWORD") == "pipe-secret"
+
+
+def test_dotenv_values_from_fifo_with_memory_map(tmp_path: pathlib.Path):
+    fifo = tmp_path / ".env"
+    os.mkfifo(fifo)
+
+    def writer():
+        with open(fifo, "w", encoding="utf-8") as w:
+            w.write("MY_PASSWORD=pipe-secret\n")
+
+    t = threading.Thread(target=writer)
+    t.start()
+
+    values = dotenv_values(dotenv_path=str(fifo), memory_map=True)
+    t.join(timeout=2)
+
+    assert values == {"MY_PASSWORD": "pipe-secret"}
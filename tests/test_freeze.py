@@ -0,0 +1,87 @@
+import os
+import sys
+from unittest import mock
+
+import pytest
+
+import dotenv
+from dotenv.freeze import freeze, load_frozen, render_module
+
+
+@pytest.fixture
+def module_dir(tmp_path):
+    directory = tmp_path / "modules"
+    directory.mkdir()
+    with mock.patch.object(sys, "path", [str(directory), *sys.path]):
+        yield directory
+    for name in ["frozen_env", "not_frozen"]:
+        sys.modules.pop(name, None)
+
+
+def test_render_module():
+    values = {"a": "b", "c": None, "d": "'\"\\\nà\udc80"}
+
+    namespace: dict = {}
+    exec(render_module(values, False, ".env"), namespace)
+
+    assert namespace["VALUES"] == values
+    assert namespace["INTERPOLATED"] is False
+
+
+@mock.patch.dict(os.environ, {"x": "1"}, clear=True)
+@pytest.mark.parametrize(
+    "interpolate,expected",
+    [
+        (True, {"a": "1", "b": None, "c": "1 2"}),
+        (False, {"a": "2", "b": None, "c": "2 2"}),
+    ],
+)
+def test_load_dotenv_frozen(dotenv_path, module_dir, interpolate, expected):
+    dotenv_path.write_text("a=${x}\nb\nc='${a} 2'")
+
+    values = freeze(dotenv_path, module_dir / "frozen_env.py", interpolate)
+    assert values == dotenv.dotenv_values(dotenv_path, interpolate=interpolate)
+
+    os.environ["x"] = "2"
+    with mock.patch("builtins.open") as mock_open:
+        result = dotenv.load_dotenv(frozen="frozen_env")
+
+    assert result is True
+    assert {k: os.environ.get(k) for k in expected} == expected
+    mock_open.assert_not_called()
+
+
+def test_dotenv_values_frozen(dotenv_path, module_dir):
+    dotenv_path.write_text("a=b\nc=${a}")
+    freeze(dotenv_path, module_dir / "frozen_env.py")
+
+    import frozen_env  # type: ignore[import-not-found]
+
+    result = dotenv.dotenv_values(frozen=frozen_env, keys=["c"])
+
+    assert result == {"c": "b"}
+
+
+def test_dotenv_reload_frozen(dotenv_path, module_dir):
+    dotenv_path.write_text("a=b")
+    freeze(dotenv_path, module_dir / "frozen_env.py")
+    dotenv_path.write_text("a=c")
+    env = dotenv.main.DotEnv(dotenv_path, frozen="frozen_env")
+
+    assert env.reload() == {"a": "b"}
+    assert not env.is_stale()
+    assert env.reload() == {"a": "b"}
+
+
+def test_load_frozen_invalid_module(module_dir):
+    (module_dir / "not_frozen.py").write_text("VALUES = {}\n")
+
+    with pytest.raises(ValueError, match="Not a frozen .env module: not_frozen"):
+        load_frozen("not_frozen")
+
+
+def test_freeze_non_existent_file(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        freeze(tmp_path / ".env", tmp_path / "frozen_env.py")
+
+    assert not (tmp_path / "frozen_env.py").exists()
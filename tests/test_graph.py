@@ -0,0 +1,88 @@
+import os
+from unittest import mock
+
+import pytest
+
+from dotenv.graph import CyclicReferenceError, VariableGraph
+
+
+def test_variable_graph():
+    graph = VariableGraph(
+        [("a", "${b}${c}"), ("b", "${c:-x}"), ("c", None), ("d", "${e}"), ("b", "${c}")]
+    )
+
+    assert graph.references("a") == {"b", "c"}
+    assert graph.references("b") == {"c"}
+    assert graph.references("c") == set()
+    assert graph.references("d") == set()
+    assert graph.dependents("c") == {"a", "b"}
+    assert graph.dependents("a") == set()
+    assert graph.dependents("x") == set()
+    assert graph.closure(["a", "x"]) == {"a", "b", "c"}
+
+
+def test_variable_graph_order():
+    graph = VariableGraph([("a", "${b}"), ("b", "${c}"), ("c", "1"), ("d", "2")])
+
+    order = graph.order()
+
+    assert sorted(order) == ["a", "b", "c", "d"]
+    assert order.index("c") < order.index("b") < order.index("a")
+    assert graph.order(["b"]) == ["c", "b"]
+
+
+@pytest.mark.parametrize(
+    "values,cycle",
+    [
+        ([("a", "${b}"), ("b", "${a}")], {"a", "b"}),
+        ([("a", "${b}"), ("b", "${c}"), ("c", "${d}"), ("d", "${b}")], {"b", "c", "d"}),
+    ],
+)
+def test_variable_graph_cycle(values, cycle):
+    graph = VariableGraph(values)
+
+    with pytest.raises(CyclicReferenceError, match="Cyclic references between") as e:
+        graph.order()
+
+    assert set(e.value.keys) == cycle
+    assert len(e.value.keys) == len(cycle)
+
+
+@mock.patch.dict(os.environ, {"a": "env", "PATH": "/bin"}, clear=True)
+@pytest.mark.parametrize(
+    "override,expected",
+    [
+        (True, {"b": "x-1", "PATH": "/bin:x-1", "a": "x", "c": None}),
+        (False, {"b": "env-1", "PATH": "/bin:env-1", "a": "x", "c": None}),
+    ],
+)
+def test_variable_graph_resolve(override, expected):
+    graph = VariableGraph(
+        [("b", "${a}-${d:-1}"), ("PATH", "${PATH}:${b}"), ("a", "x"), ("c", None)]
+    )
+
+    result = graph.resolve(override)
+
+    assert result == expected
+    assert list(result) == ["b", "PATH", "a", "c"]
+
+
+def test_variable_graph_changed():
+    old = VariableGraph([("a", "${b}"), ("b", "1"), ("c", "${d}"), ("e", "${a}")])
+    new = VariableGraph(
+        [("a", "${b}"), ("b", "2"), ("c", "${d}"), ("d", "3"), ("f", "4")]
+    )
+
+    assert new.readers("d") == {"c"}
+    assert new.readers("x") == set()
+    assert new.affected(["b"]) == {"a", "b"}
+    assert new.changed(old) == {"a", "b", "c", "d", "f"}
+    assert new.changed(new) == set()
+
+
+def test_variable_graph_resolve_known():
+    graph = VariableGraph([("a", "${b}-${c}"), ("b", "${c}"), ("c", "1")])
+
+    result = graph.resolve(True, ["a"], known={"b": "kept"}, environ={})
+
+    assert result == {"a": "kept-1", "b": "kept", "c": "1"}
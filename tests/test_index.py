@@ -0,0 +1,108 @@
+import os
+from unittest import mock
+
+import pytest
+
+import dotenv
+from dotenv.index import Index, build_index, index_path, lookup
+
+
+@pytest.mark.parametrize(
+    "content,encoding",
+    [
+        (b"", "utf-8"),
+        (b"a=b\nc='d\ne'\n# f=g\n\nh\n  i=j # k\na=l", "utf-8"),
+        (b"\xef\xbb\xbfa=\xc3\xa0\r\nb=\"c\r\nd\"\r\n'e f'=g\r\n", "utf-8"),
+        (b"\xef\xbb\xbfa=\xc3\xa0\nb=c", "utf-8-sig"),
+        (b"a=b\nc=\xc3\xa0\n", "utf-8-sig"),
+        (b"a=\xe0\rb=c d\r", "latin-1"),
+        ("a=b\nc='d\ne'".encode("utf-16"), "utf-16"),
+    ],
+)
+def test_lookup(dotenv_path, content, encoding):
+    dotenv_path.write_bytes(content)
+    expected = dotenv.dotenv_values(dotenv_path, encoding=encoding)
+
+    build_index(dotenv_path, encoding)
+
+    for key, value in expected.items():
+        assert lookup(dotenv_path, key, encoding) == (True, value)
+    assert lookup(dotenv_path, "x", encoding) == (False, None)
+
+
+def test_lookup_without_index(dotenv_path):
+    dotenv_path.write_text("a=b")
+
+    assert lookup(dotenv_path, "a") is None
+
+
+def test_lookup_interpolated_value(dotenv_path):
+    dotenv_path.write_text("a=b\nc=${a}")
+    build_index(dotenv_path)
+
+    assert lookup(dotenv_path, "a") == (True, "b")
+    assert lookup(dotenv_path, "c") is None
+
+
+def test_lookup_stale_index(dotenv_path):
+    dotenv_path.write_text("a=b")
+    build_index(dotenv_path)
+
+    with dotenv_path.open("a") as f:
+        f.write("\nc=d")
+
+    assert lookup(dotenv_path, "a") is None
+
+
+def test_lookup_other_encoding(dotenv_path):
+    dotenv_path.write_text("a=b")
+    build_index(dotenv_path, "utf-8")
+
+    assert lookup(dotenv_path, "a", "latin-1") is None
+
+
+def test_index_find(dotenv_path):
+    keys = [f"KEY_{index}" for index in range(100)] + ["à", "'b c'", '"']
+    dotenv_path.write_text(
+        "".join(f"{key}={index}\n" for index, key in enumerate(keys))
+    )
+    build_index(dotenv_path)
+    index = Index.open(dotenv_path)
+    assert index is not None
+
+    with index:
+        found = {key: index.find(key.strip("'")) for key in keys}
+        missing = [index.find(key) for key in ["", "KEY_", "KEY_999", "\uffff"]]
+
+    assert all(location is not None for location in found.values())
+    assert missing == [None, None, None, None]
+
+
+def test_get_key_with_index(dotenv_path):
+    dotenv_path.write_text("a=b\nc")
+    build_index(dotenv_path)
+
+    with mock.patch("dotenv.main.DotEnv") as mock_dotenv:
+        assert dotenv.get_key(dotenv_path, "a") == "b"
+        assert dotenv.get_key(dotenv_path, "c") is None
+        assert dotenv.get_key(dotenv_path, "d") is None
+
+    mock_dotenv.assert_not_called()
+
+
+def test_set_and_unset_key_refresh_index(dotenv_path):
+    dotenv_path.write_text("a=b\nc=d\n")
+    build_index(dotenv_path)
+
+    dotenv.set_key(dotenv_path, "e", "f\ng")
+    dotenv.unset_key(dotenv_path, "a")
+
+    assert lookup(dotenv_path, "a") == (False, None)
+    assert lookup(dotenv_path, "c") == (True, "d")
+    assert lookup(dotenv_path, "e") == (True, "f\ng")
+
+
+def test_set_key_without_index(dotenv_path):
+    dotenv.set_key(dotenv_path, "a", "b")
+
+    assert not os.path.exists(index_path(dotenv_path))
@@ -5,11 +5,13 @@ import stat
 import subprocess
 import sys
 import textwrap
+from typing import List
 from unittest import mock
 
 import pytest
 
 import dotenv
+from dotenv.parser import Diagnostic
 
 
 def test_set_key_no_file(tmp_path):
@@ -227,6 +229,25 @@ def test_get_key_none(dotenv_path):
     mock_warning.assert_not_called()
 
 
+def test_get_keys(dotenv_path):
+    logger = logging.getLogger("dotenv.main")
+    dotenv_path.write_text("a=b\nc\nd=${a}")
+
+    with mock.patch.object(logger, "warning") as mock_warning:
+        result = dotenv.get_keys(dotenv_path, ["d", "c", "e"])
+
+    assert result == {"d": "b", "c": None, "e": None}
+    mock_warning.assert_called_once_with("Key %s not found in %s.", "e", dotenv_path)
+
+
+def test_list_keys(dotenv_path):
+    dotenv_path.write_text("# a=b\nc=${x}\nexport d\nc=e\nf g\n'h'=i")
+
+    result = dotenv.list_keys(dotenv_path)
+
+    assert result == ["c", "d", "h"]
+
+
 def test_unset_with_value(dotenv_path):
     logger = logging.getLogger("dotenv.main")
     dotenv_path.write_text("a=b\nc=d")
@@ -676,6 +697,10 @@ def test_dotenv_values_file(dotenv_path):
         ({"b": "c"}, "b=d\na=${b}", True, {"a": "d", "b": "d"}),
         ({}, "a=b\na=c\nd=${a}", True, {"a": "c", "d": "c"}),
         ({}, "a=b\nc=${a}\nd=e\nc=${d}", True, {"a": "b", "c": "e", "d": "e"}),
+        # Nested defaults
+        ({"c": "d"}, "a=${b:-${c:-e}}", True, {"a": "d"}),
+        ({}, "a=${b:-x${c:-e}y}", True, {"a": "xey"}),
+        ({}, "c=f\na=${b:-${c}}", True, {"a": "f", "c": "f"}),
     ],
 )
 def test_dotenv_values_string_io(env, string, interpolate, expected):
@@ -695,3 +720,492 @@ def test_dotenv_values_file_stream(dotenv_path):
         result = dotenv.dotenv_values(stream=f)
 
     assert result == {"a": "b"}
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        b"",
+        b"a=b\nc='d\ne'\n",
+        b"\xef\xbb\xbfa=b",
+        b"a=\xc3\xa0 # comment\n",
+        b"a=b\xc2\xa0 c\n",
+        b"a=b\r\nc='d\r\ne'\r\n",
+        b"a b\nc=d",
+    ],
+)
+def test_dotenv_values_memory_map(dotenv_path, content):
+    dotenv_path.write_bytes(content)
+
+    result = dotenv.dotenv_values(dotenv_path, memory_map=True)
+
+    assert result == dotenv.dotenv_values(dotenv_path)
+
+
+@pytest.mark.parametrize(
+    "content,encoding,expected",
+    [
+        ("a=b\nc=${a}", "utf-8", {"a": "b", "c": "b"}),
+        ("\ufeffa=\u00e0", "utf-8", {"a": "\u00e0"}),
+        (b"a=\xc3\xa0\r\nb=c", "utf-8", {"a": "\u00e0", "b": "c"}),
+        (b"a=\xe0", "latin-1", {"a": "\u00e0"}),
+    ],
+)
+def test_dotenv_values_content(content, encoding, expected):
+    result = dotenv.dotenv_values(content=content, encoding=encoding)
+
+    assert result == expected
+
+
+def test_dotenv_values_content_prefers_file(dotenv_path):
+    dotenv_path.write_text("a=b")
+
+    result = dotenv.dotenv_values(dotenv_path, content="a=c")
+
+    assert result == {"a": "b"}
+
+
+@pytest.mark.parametrize(
+    "dialect,expected",
+    [
+        ("full", {"a": "b", "c": "d", "e": "b"}),
+        ("simple", {"a": "b", "c": "'d' # e", "# f": "g", "e": "b"}),
+        ("docker", {"a": "b", "c": "'d' # e", "e": "b"}),
+    ],
+)
+@pytest.mark.parametrize("as_bytes", [False, True])
+def test_dotenv_values_dialect(dotenv_path, dialect, expected, as_bytes):
+    content = "a=b\nc='d' # e\n# f=g\ne=${a}\n"
+    dotenv_path.write_text(content)
+
+    from_file = dotenv.dotenv_values(dotenv_path, dialect=dialect)
+    from_content = dotenv.dotenv_values(
+        content=content.encode() if as_bytes else content, dialect=dialect
+    )
+
+    assert from_file == from_content == expected
+
+
+def test_dotenv_values_dialect_warns_for_invalid_lines(dotenv_path):
+    dotenv_path.write_text("a=b\n=c\nd=e")
+    logger = logging.getLogger("dotenv.main")
+
+    with mock.patch.object(logger, "warning") as mock_warning:
+        result = dotenv.dotenv_values(dotenv_path, dialect="simple")
+
+    assert result == {"a": "b", "d": "e"}
+    mock_warning.assert_called_once_with(
+        "python-dotenv could not parse statement starting at line %s", 2
+    )
+
+
+@pytest.mark.parametrize("dialect", ["full", "docker"])
+def test_dotenv_values_warns_once_for_invalid_lines(dotenv_path, dialect):
+    dotenv_path.write_text("a=b\n" + "c d\n" * 12 + "e=f\n")
+    logger = logging.getLogger("dotenv.main")
+
+    with mock.patch.object(logger, "warning") as mock_warning:
+        result = dotenv.dotenv_values(dotenv_path, dialect=dialect)
+
+    assert result == {"a": "b", "e": "f"}
+    mock_warning.assert_called_once_with(
+        "python-dotenv could not parse %s statements starting at lines %s%s",
+        12,
+        "2, 3, 4, 5, 6, 7, 8, 9, 10, 11",
+        ", ...",
+    )
+
+
+@pytest.mark.parametrize("memory_map", [False, True])
+@pytest.mark.parametrize("dialect", ["full", "docker"])
+def test_dotenv_values_diagnostics(dotenv_path, dialect, memory_map):
+    dotenv_path.write_text("a=b\n=c\nd=e\n  =f\n")
+    logger = logging.getLogger("dotenv.main")
+    diagnostics: List[Diagnostic] = []
+
+    with mock.patch.object(logger, "warning") as mock_warning:
+        result = dotenv.dotenv_values(
+            dotenv_path,
+            dialect=dialect,
+            memory_map=memory_map,
+            workers=2,
+            diagnostics=diagnostics,
+        )
+
+    assert result == {"a": "b", "d": "e"}
+    assert diagnostics == [(2, 1, 4, "missing key"), (4, 3, 13, "missing key")]
+    mock_warning.assert_not_called()
+
+
+def test_parse_diagnostics(dotenv_path):
+    content = "a=b\nc d\ne='f\n"
+    dotenv_path.write_text(content)
+    expected = [
+        (2, 3, 6, "unexpected text after key"),
+        (3, 3, 10, "unterminated quoted value"),
+    ]
+
+    assert dotenv.parse_diagnostics(dotenv_path) == expected
+    assert dotenv.parse_diagnostics(str(dotenv_path)) == expected
+    assert dotenv.parse_diagnostics(io.StringIO(content)) == expected
+    assert dotenv.parse_diagnostics(io.StringIO("a=b\n")) == []
+
+
+def test_dotenv_values_unknown_dialect(dotenv_path):
+    with pytest.raises(ValueError, match="Unknown dialect: bogus"):
+        dotenv.dotenv_values(dotenv_path, dialect="bogus")
+
+
+@pytest.mark.parametrize(
+    "keys,prefix",
+    [
+        (["e"], None),
+        (["a", "e", "x"], None),
+        (None, "APP_"),
+        (["b"], "APP_"),
+        ([], None),
+    ],
+)
+@pytest.mark.parametrize("interpolate", [True, False])
+@mock.patch.dict(os.environ, {"b": "env"}, clear=True)
+def test_dotenv_values_keys(keys, prefix, interpolate):
+    content = textwrap.dedent(
+        """
+        a=1
+        APP_A=${a}
+        b=${a}${c:-d}
+        a=2
+        e=${b}-${a}-${APP_A}
+        APP_B
+        a=${a}3
+        """
+    )
+    everything = dotenv.dotenv_values(content=content, interpolate=interpolate)
+
+    result = dotenv.dotenv_values(
+        content=content, interpolate=interpolate, keys=keys, prefix=prefix
+    )
+
+    assert result == {
+        key: value
+        for key, value in everything.items()
+        if key in (keys or []) or (prefix is not None and key.startswith(prefix))
+    }
+    assert list(result) == [key for key in everything if key in result]
+
+
+@mock.patch.dict(os.environ, {"b": "env"}, clear=True)
+def test_load_dotenv_keys():
+    result = dotenv.load_dotenv(content="a=1\nb=2\nc=${b}", keys=["c"])
+
+    assert result is True
+    assert os.environ == {"b": "env", "c": "env"}
+
+
+@pytest.mark.parametrize("dialect", ["full", "simple"])
+def test_dotenv_values_workers(dotenv_path, dialect):
+    dotenv_path.write_text("a=b\nc='${a}\nd'\ne f\n" * 20)
+    logger = logging.getLogger("dotenv.main")
+
+    with mock.patch.object(logger, "warning") as mock_warning:
+        result = dotenv.dotenv_values(dotenv_path, dialect=dialect, workers=3)
+
+    with mock.patch.object(logger, "warning") as mock_serial_warning:
+        expected = dotenv.dotenv_values(dotenv_path, dialect=dialect)
+    assert result == expected
+    assert mock_warning.call_args_list == mock_serial_warning.call_args_list
+
+
+@mock.patch.dict(os.environ, {}, clear=True)
+def test_load_dotenv_content():
+    result = dotenv.load_dotenv(content=b"a=b")
+
+    assert result is True
+    assert os.environ == {"a": "b"}
+
+
+def test_dotenv_values_memory_map_warns_for_invalid_lines(dotenv_path):
+    dotenv_path.write_bytes(b"a=b\nc d\ne=f")
+    logger = logging.getLogger("dotenv.main")
+
+    with mock.patch.object(logger, "warning") as mock_warning:
+        result = dotenv.dotenv_values(dotenv_path, memory_map=True)
+
+    assert result == {"a": "b", "e": "f"}
+    mock_warning.assert_called_once_with(
+        "python-dotenv could not parse statement starting at line %s", 2
+    )
+
+
+@pytest.mark.parametrize(
+    "dialect,parser,parsed",
+    [
+        ("full", "parse_complete", "c='d\ne'\nf=${a}\ng=h"),
+        ("docker", "parse_pairs", "e'\nf=${a}\n"),
+        ("simple", "parse_pairs", "e'\nf=${a}\n"),
+    ],
+)
+def test_dotenv_reload_appended(dotenv_path, dialect, parser, parsed):
+    dotenv_path.write_text("a=b\nc='d\n")
+    env = dotenv.main.DotEnv(dotenv_path, dialect=dialect)
+    env.reload()
+
+    with dotenv_path.open("a") as file:
+        file.write("e'\nf=${a}\ng=h")
+    function = getattr(dotenv.main, parser)
+    with mock.patch(f"dotenv.main.{parser}", wraps=function) as mock_parse:
+        result = env.reload()
+
+    assert result == dotenv.dotenv_values(dotenv_path, dialect=dialect)
+    first = mock_parse.call_args_list[0].args[0]
+    assert (first if isinstance(first, str) else first.getvalue()) == parsed
+
+    with dotenv_path.open("a") as file:
+        file.write("i\n")
+    result = env.reload()
+
+    assert result == dotenv.dotenv_values(dotenv_path, dialect=dialect)
+    assert result["g"] == "hi"
+
+
+@pytest.mark.parametrize(
+    "prefix_max_size,parsed",
+    [
+        (dotenv.main.PREFIX_MAX_SIZE, "e=f\n"),
+        (0, "a=b\nc=d\ne=f\n"),
+    ],
+)
+def test_dotenv_reload_appended_after_dict(dotenv_path, prefix_max_size, parsed):
+    dotenv_path.write_text("a=b\nc=d\n")
+    env = dotenv.main.DotEnv(dotenv_path)
+    with mock.patch("dotenv.main.PREFIX_MAX_SIZE", prefix_max_size):
+        assert env.get("a") == "b"
+
+    with dotenv_path.open("a") as file:
+        file.write("e=f\n")
+    with mock.patch(
+        "dotenv.main.parse_complete", wraps=dotenv.main.parse_complete
+    ) as mock_parse:
+        result = env.reload()
+
+    assert result == {"a": "b", "c": "d", "e": "f"}
+    assert mock_parse.call_args_list[0].args[0] == parsed
+
+
+@pytest.mark.parametrize("dialect", ["simple", "docker"])
+def test_dotenv_values_line_dialect_parses_pairs(dotenv_path, dialect):
+    dotenv_path.write_text("a=b\nc=d\n")
+
+    with (
+        mock.patch(
+            "dotenv.main.parse_complete", wraps=dotenv.main.parse_complete
+        ) as mock_complete,
+        mock.patch("dotenv.main._digest", wraps=dotenv.main._digest) as mock_digest,
+    ):
+        result = dotenv.dotenv_values(dotenv_path, dialect=dialect)
+
+    assert result == {"a": "b", "c": "d"}
+    mock_complete.assert_not_called()
+    mock_digest.assert_not_called()
+
+
+def test_dotenv_reload_changed(dotenv_path):
+    dotenv_path.write_text("a=b\nc=d\n")
+    env = dotenv.main.DotEnv(dotenv_path)
+    env.reload()
+
+    dotenv_path.write_text("a=x\nc=d\ne=f\n")
+    with mock.patch(
+        "dotenv.main.parse_complete", wraps=dotenv.main.parse_complete
+    ) as mock_parse:
+        result = env.reload()
+
+    assert result == {"a": "x", "c": "d", "e": "f"}
+    assert mock_parse.call_args_list[0].args[0] == "a=x\nc=d\ne=f\n"
+
+
+def test_dotenv_reload_content():
+    env = dotenv.main.DotEnv(None, content="a=b\nc=${a}")
+
+    assert env.reload() == {"a": "b", "c": "b"}
+    assert env.reload() == {"a": "b", "c": "b"}
+
+
+def test_dotenv_dict_caches_empty_values(dotenv_path):
+    env = dotenv.main.DotEnv(dotenv_path)
+
+    with mock.patch.object(env, "parse", wraps=env.parse) as mock_parse:
+        assert env.dict() == {}
+        assert env.get("a") is None
+        assert env.set_as_environment_variables() is False
+
+    mock_parse.assert_called_once_with()
+
+
+def test_dotenv_is_stale(dotenv_path):
+    dotenv_path.write_text("a=b")
+    env = dotenv.main.DotEnv(dotenv_path)
+
+    assert env.is_stale()
+    env.dict()
+    assert not env.is_stale()
+
+    dotenv_path.write_text("a=bc")
+    assert env.is_stale()
+    assert env.reload() == {"a": "bc"}
+    assert not env.is_stale()
+
+    dotenv_path.unlink()
+    assert env.is_stale()
+    assert env.reload() == {}
+    assert not env.is_stale()
+
+    dotenv_path.write_text("")
+    assert env.is_stale()
+
+
+def test_dotenv_is_stale_stream():
+    env = dotenv.main.DotEnv(None, stream=io.StringIO("a=b"))
+
+    assert env.is_stale()
+    assert env.reload() == {"a": "b"}
+    assert not env.is_stale()
+    assert env.reload() == {"a": "b"}
+
+
+def test_dotenv_reload_not_stale(dotenv_path):
+    dotenv_path.write_text("a=b")
+    env = dotenv.main.DotEnv(dotenv_path)
+    env.dict()
+
+    with mock.patch("dotenv.main.parse_complete") as mock_parse:
+        result = env.reload()
+
+    assert result == {"a": "b"}
+    mock_parse.assert_not_called()
+
+
+def test_dotenv_invalidate(dotenv_path):
+    dotenv_path.write_text("a=b")
+    env = dotenv.main.DotEnv(dotenv_path)
+    env.dict()
+
+    env.invalidate()
+
+    assert env.is_stale()
+    with mock.patch.object(env, "parse", wraps=env.parse) as mock_parse:
+        assert env.dict() == {"a": "b"}
+    mock_parse.assert_called_once_with()
+
+
+@pytest.mark.parametrize(
+    "content,other,same",
+    [
+        ("a=b\nc=d", "# comment\n  a = 'b'\n\nexport c=\"d\" # e\n", True),
+        ("a=b\nc", "a=b\r\nc\r\n", True),
+        ("a=b\nc=d", "c=d\na=b", False),
+        ("a=b", "a=b\na=b", False),
+        ("a=b\nc", "a=b\nc=", False),
+        ("a=bc", "ab=c", False),
+        ("a=${b}", "a=", False),
+    ],
+)
+def test_fingerprint(dotenv_path, content, other, same):
+    dotenv_path.write_text(content)
+    expected = dotenv.fingerprint(dotenv_path)
+
+    result = dotenv.fingerprint(stream=io.StringIO(other))
+
+    assert (result == expected) is same
+    assert len(result) == 128
+
+
+@mock.patch.dict(os.environ, {"b": "c"}, clear=True)
+def test_fingerprint_interpolate():
+    result = dotenv.fingerprint(stream=io.StringIO("a=${b}"), interpolate=True)
+
+    assert result == dotenv.fingerprint(stream=io.StringIO("a=c"))
+    assert result != dotenv.fingerprint(stream=io.StringIO("a=${b}"))
+
+
+@mock.patch.dict(os.environ, {"b": "env"}, clear=True)
+@pytest.mark.parametrize(
+    "keys,expected",
+    [
+        (None, {"a": "c-d", "b": "c", "e": "d"}),
+        (["a"], {"a": "c-d"}),
+    ],
+)
+def test_dotenv_values_forward_references(keys, expected):
+    result = dotenv.dotenv_values(
+        content="a=${b}-${e}\nb=x\nb=c\ne=d", keys=keys, forward_references=True
+    )
+
+    assert result == expected
+
+
+def test_dotenv_values_forward_references_cycle():
+    with pytest.raises(ValueError, match=r"^Cyclic references between (a, b|b, a)$"):
+        dotenv.dotenv_values(content="a=${b}\nb=${a}", forward_references=True)
+
+
+def test_dotenv_variable_graph(dotenv_path):
+    dotenv_path.write_text("a=${b}\nb=1\nc=${b}")
+    env = dotenv.main.DotEnv(dotenv_path)
+
+    graph = env.variable_graph()
+
+    assert graph.dependents("b") == {"a", "c"}
+    assert env.variable_graph() is graph
+    dotenv_path.write_text("a=1")
+    env.reload()
+    assert env.variable_graph().dependents("b") == set()
+
+
+@pytest.mark.parametrize("forward_references", [False, True])
+def test_dotenv_reload_changes(dotenv_path, forward_references):
+    dotenv_path.write_text("a=1\nb=${a}-x\nc=2\nd=${c}\ne=3\n")
+    env = dotenv.main.DotEnv(dotenv_path, forward_references=forward_references)
+
+    assert env.reload_changes() == {"a", "b", "c", "d", "e"}
+    assert env.reload_changes() == set()
+
+    dotenv_path.write_text("a=10\nb=${a}-x\nc=2\nd=${c}\nf=4\n")
+
+    assert env.reload_changes() == {"a", "b", "e", "f"}
+    assert env.dict() == {"a": "10", "b": "10-x", "c": "2", "d": "2", "f": "4"}
+
+
+def test_dotenv_reload_changes_interpolates_changed_keys(dotenv_path):
+    dotenv_path.write_text("a=${b}\nb=1\nc=${d}\nd=2\ne=${c}\n")
+    env = dotenv.main.DotEnv(dotenv_path, forward_references=True)
+    env.dict()
+
+    dotenv_path.write_text("a=${b}\nb=1\nc=${d}\nd=20\ne=${c}\n")
+    with mock.patch.object(
+        dotenv.variables.Variable,
+        "resolve",
+        autospec=True,
+        side_effect=dotenv.variables.Variable.resolve,
+    ) as mock_resolve:
+        result = env.reload_changes()
+
+    assert result == {"c", "d", "e"}
+    assert sorted(call.args[0].name for call in mock_resolve.call_args_list) == [
+        "c",
+        "d",
+    ]
+    assert env.dict() == {"a": "1", "b": "1", "c": "20", "d": "20", "e": "20"}
+
+
+@mock.patch.dict(os.environ, {"HOME": "/home/a"}, clear=True)
+def test_dotenv_reload_changes_environment(dotenv_path):
+    dotenv_path.write_text("a=${HOME}/x\nb=${a}\nc=${d}\n")
+    env = dotenv.main.DotEnv(dotenv_path, forward_references=True)
+    env.dict()
+
+    os.environ["HOME"] = "/home/b"
+    dotenv_path.write_text("a=${HOME}/x\nb=${a}\nc=${d}\nd=1\n")
+
+    assert env.reload_changes() == {"a", "b", "c", "d"}
+    assert env.dict() == {"a": "/home/b/x", "b": "/home/b/x", "c": "1", "d": "1"}
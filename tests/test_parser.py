@@ -1,8 +1,24 @@
 import io
+import pickle
 
 import pytest
 
-from dotenv.parser import Binding, Original, parse_stream
+from dotenv.parser import (
+    Binding,
+    Diagnostic,
+    Original,
+    StreamParser,
+    diagnose,
+    get_scanner,
+    parse_bytes,
+    parse_pairs,
+    parse_pairs_parallel,
+    parse_parallel,
+    parse_stream,
+    parse_stream_reference,
+    parse_string,
+    scan_bytes,
+)
 
 
 @pytest.mark.parametrize(
@@ -580,3 +596,368 @@ def test_parse_stream(test_input, expected):
     result = parse_stream(io.StringIO(test_input))
 
     assert list(result) == expected
+
+
+@pytest.mark.parametrize(
+    "test_input",
+    [
+        "export =b",
+        "export ",
+        "export export a=b",
+        "export #a=b",
+        "a= 'b",
+        "a='b\\' # 'c",
+        'a="b\\"',
+        "a='b' c",
+        "'a b'=c d",
+        "'a=b",
+        "a b=c",
+        "=a\nb=c",
+        "a=b\r\n c d\r\ne=f",
+        "a='b\r\nc' junk\r\nd=e",
+        "a\x1c=\x1cb\x1c#c",
+        " \n\t\r\n",
+    ],
+)
+def test_parse_stream_matches_reference(test_input):
+    result = parse_stream(io.StringIO(test_input))
+
+    assert list(result) == list(parse_stream_reference(io.StringIO(test_input)))
+
+
+@pytest.mark.parametrize(
+    "parse",
+    [
+        parse_stream,
+        parse_stream_reference,
+        lambda stream: scan_bytes(stream.read().encode()),
+    ],
+)
+@pytest.mark.parametrize(
+    "test_input,expected",
+    [
+        ('a="' + '\\"' * 20 + 'b"\n', '"' * 20 + "b"),
+        ('a="' + '\\"' * 20 + "\n", '"' * 19 + "\\"),
+        ("a='" + "\\'" * 20 + "' # c", "'" * 20),
+        ("a='" + "\\'x" * 20 + "\\'", "'x" * 20 + "\\"),
+        ('a="\\\\"\n', "\\"),
+    ],
+)
+def test_parse_stream_escaped_quotes(parse, test_input, expected):
+    (binding,) = parse(io.StringIO(test_input))
+
+    assert binding.value == expected
+
+
+@pytest.mark.parametrize("parse", [parse_stream, parse_stream_reference])
+@pytest.mark.parametrize(
+    "test_input,expected",
+    [
+        (
+            'a="\\\\ \\\' \\" \\a \\b \\f \\n \\r \\t \\v"',
+            "\\ ' \" \a \b \f \n \r \t \v",
+        ),
+        ('a="\\x \\u00e0 \\\\n \\"', "\\x \\u00e0 \\n \\"),
+        ("a='\\\\ \\' \\n'", "\\ ' \\n"),
+    ],
+)
+def test_parse_stream_escapes(parse, test_input, expected):
+    (binding,) = parse(io.StringIO(test_input))
+
+    assert binding.value == expected
+
+
+@pytest.mark.parametrize("parse", [parse_stream, parse_stream_reference])
+@pytest.mark.parametrize(
+    "test_input,expected",
+    [
+        ("a=b\nc=d\r\ne=f\rg=h", [1, 2, 3, 4]),
+        ("a=b\n\n\nc=d", [1, 2]),
+        ("a='b\nc'\nd=e", [1, 3]),
+        # Error recovery stops between "\r" and "\n", which then count as two
+        # line breaks.
+        ("a b\r\nc=d", [1, 2]),
+        ("a b\r\n\r\nc=d\r\n", [1, 2]),
+        ("a b\r\nc d\r\ne=f", [1, 2, 4]),
+    ],
+)
+def test_parse_stream_line_numbers(parse, test_input, expected):
+    result = parse(io.StringIO(test_input))
+
+    assert [binding.original.line for binding in result] == expected
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7])
+@pytest.mark.parametrize(
+    "test_input",
+    [
+        "a=b\nc=d",
+        "a=b\r\nc=d\r\n",
+        'a=\'b\nc\'\nd="e\\"\nf"\n',
+        "# comment\n\n  export a=b # c\n",
+        "a b\r\nc='d\ne=f",
+        "\ufeffa=b",
+    ],
+)
+def test_parse_stream_chunked(chunk_size, test_input):
+    result = parse_stream(io.StringIO(test_input), chunk_size=chunk_size)
+
+    assert list(result) == list(parse_stream(io.StringIO(test_input)))
+
+
+def test_stream_parser_returns_complete_bindings():
+    parser = StreamParser()
+
+    assert parser.feed("a=b\nc=") == [
+        Binding(key="a", value="b", original=Original("a=b\n", 1), error=False)
+    ]
+    assert parser.feed("'d\n") == []
+    assert parser.feed("e'\n") == [
+        Binding(key="c", value="d\ne", original=Original("c='d\ne'\n", 2), error=False)
+    ]
+    assert parser.feed("f=g") == []
+    assert parser.close() == [
+        Binding(key="f", value="g", original=Original("f=g", 4), error=False)
+    ]
+
+
+def test_stream_parser_feed_after_close():
+    parser = StreamParser()
+    parser.close()
+
+    with pytest.raises(ValueError):
+        parser.feed("a=b")
+
+
+@pytest.mark.parametrize(
+    "test_input",
+    [
+        "a=b\nc='d\ne'\n# comment\nexport f=\"g\\n\"",
+        "a=\u00e0 b",
+        "a=b\u00a0 c",
+        "a=b\r\nc d\r\ne=f",
+        "a='b\nc=d",
+        "\ufeffa=b",
+    ],
+)
+@pytest.mark.parametrize("encoding", ["utf-8", "utf-8-sig", "utf-16"])
+def test_scan_bytes(test_input, encoding):
+    data = test_input.encode(encoding)
+
+    result = scan_bytes(data, encoding)
+
+    assert list(result) == list(parse_stream(io.StringIO(data.decode(encoding))))
+
+
+@pytest.mark.parametrize(
+    "test_input",
+    [
+        "",
+        "a=b\nc='d\ne'\n# comment",
+        "a b\r\nc d\re=f",
+        "\ufeffa=b",
+    ],
+)
+def test_parse_string(test_input):
+    result = parse_string(test_input)
+
+    assert list(result) == list(parse_stream(io.StringIO(test_input)))
+
+
+@pytest.mark.parametrize(
+    "test_input",
+    [
+        b"a=b\nc='d\ne'\n# comment",
+        b"a=b\r\nc='d\r\ne'\r\n",
+        b"a b\rc d\r\ne=f",
+        b"\xef\xbb\xbfa=\xc3\xa0",
+    ],
+)
+@pytest.mark.parametrize("wrap", [bytes, memoryview])
+def test_parse_bytes(tmp_path, test_input, wrap):
+    path = tmp_path / ".env"
+    path.write_bytes(test_input)
+
+    result = parse_bytes(wrap(test_input), "utf-8")
+
+    with open(path, encoding="utf-8") as stream:
+        assert list(result) == list(parse_stream(stream))
+
+
+def test_original_behaves_like_a_tuple():
+    original = Original.lazy(b"a=b\nc=d\n", 4, 8, 2)
+
+    assert original == Original("c=d\n", 2)
+    assert original == ("c=d\n", 2)
+    assert tuple(original) == ("c=d\n", 2)
+    assert original[0] == "c=d\n"
+    assert original[-1] == 2
+    assert original[:] == ("c=d\n", 2)
+    assert len(original) == 2
+    string, line = original
+    assert (string, line) == ("c=d\n", 2)
+    assert hash(original) == hash(Original("c=d\n", 2))
+    assert repr(original) == "Original(string='c=d\\n', line=2)"
+    assert pickle.loads(pickle.dumps(original)) == original
+
+
+@pytest.mark.parametrize(
+    "parse",
+    [
+        lambda string: parse_string(string, keys_only=True),
+        lambda string: parse_stream(io.StringIO(string), chunk_size=2, keys_only=True),
+        lambda string: parse_bytes(string.encode(), keys_only=True),
+    ],
+)
+def test_parse_keys_only(parse):
+    result = parse("# a\n\nb=c\nd e\n  # f\ng\n")
+
+    assert list(result) == [
+        Binding(key="b", value="c", original=Original("\nb=c\n", 2), error=False),
+        Binding(key=None, value=None, original=Original("d e\n", 4), error=True),
+        Binding(key="g", value=None, original=Original("g\n", 6), error=False),
+    ]
+
+
+@pytest.mark.parametrize(
+    "dialect,test_input,expected",
+    [
+        (
+            "simple",
+            "a='b' # c\r\n=d\n\ne\n export f=g=h",
+            [
+                Binding("a", "'b' # c", Original("a='b' # c\r\n", 1), False),
+                Binding(None, None, Original("=d\n", 2), True),
+                Binding(None, None, Original("\n", 3), False),
+                Binding("e", None, Original("e\n", 4), False),
+                Binding(" export f", "g=h", Original(" export f=g=h", 5), False),
+            ],
+        ),
+        (
+            "docker",
+            ' # a\r\n b="c" \r\nd e=f\n\tg\rh=i',
+            [
+                Binding(None, None, Original(" # a\r\n", 1), False),
+                Binding("b", '"c" ', Original(' b="c" \r\n', 2), False),
+                Binding(None, None, Original("d e=f\n", 3), True),
+                Binding("g\rh", "i", Original("\tg\rh=i", 4), False),
+            ],
+        ),
+    ],
+)
+def test_parse_stream_dialects(dialect, test_input, expected):
+    result = parse_stream(io.StringIO(test_input), dialect=dialect)
+
+    assert list(result) == expected
+
+
+@pytest.mark.parametrize("dialect", ["full", "simple", "docker"])
+@pytest.mark.parametrize("chunk_size", [1, 3])
+def test_parse_stream_dialects_chunked(dialect, chunk_size):
+    test_input = "a=b\r\n\r\nc d=e\rf\n#g=h\n=i"
+
+    result = parse_stream(io.StringIO(test_input), chunk_size, dialect=dialect)
+
+    assert list(result) == list(parse_string(test_input, dialect=dialect))
+
+
+@pytest.mark.parametrize("dialect", ["simple", "docker"])
+@pytest.mark.parametrize("chunk_size", [None, 1, 3])
+def test_parse_pairs(dialect, chunk_size):
+    test_input = "\ufeffa=b\r\n\r\nc d=e\rf\n#g=h\n=i\nj"
+
+    result = parse_pairs(io.StringIO(test_input), chunk_size, dialect)
+
+    assert list(result) == [
+        (binding.key, binding.value, binding.original.line)
+        for binding in parse_string(test_input, keys_only=True, dialect=dialect)
+    ]
+
+
+def test_parse_pairs_line():
+    result = parse_pairs(io.StringIO("\ufeffa=b\n=c\n"), dialect="simple", line=3)
+
+    assert list(result) == [("\ufeffa", "b", 3), (None, None, 4)]
+
+
+def test_unknown_dialect():
+    with pytest.raises(ValueError, match="Unknown dialect: bogus"):
+        get_scanner("bogus")
+    with pytest.raises(ValueError, match="Unknown dialect: bogus"):
+        list(parse_pairs(io.StringIO(""), dialect="bogus"))
+    with pytest.raises(ValueError, match="Dialect full isn't line-based"):
+        list(parse_pairs(io.StringIO(""), dialect="full"))
+
+
+@pytest.mark.parametrize(
+    "dialect,test_input,expected",
+    [
+        ("full", "a b\n", (1, 3, 2, "unexpected text after key")),
+        ("full", "\n\n  =b\n", (3, 3, 4, "missing key")),
+        ("full", "'a=b\n", (1, 1, 0, "unterminated quoted key")),
+        ("full", "a='b\n", (1, 3, 2, "unterminated quoted value")),
+        ("full", "a='b\nc' d\n", (2, 4, 8, "unexpected text after value")),
+        ("full", "a='b\rc' d", (2, 4, 8, "unexpected text after value")),
+        ("simple", "=b\n", (1, 1, 0, "missing key")),
+        ("docker", " =b\n", (1, 2, 1, "missing key")),
+        ("docker", "  a\tb c=d\r\n", (1, 4, 3, "whitespace in key")),
+    ],
+)
+def test_diagnose(dialect, test_input, expected):
+    (binding,) = get_scanner(dialect)(test_input, 1, True)
+
+    result = diagnose(binding, 10, dialect)
+
+    line, column, offset, reason = expected
+    assert binding.error
+    assert result == Diagnostic(line, column, 10 + offset, reason)
+
+
+@pytest.mark.parametrize(
+    "test_input",
+    [
+        "",
+        "a=b\n" * 20,
+        "\ufeffa=b\r\n\r\nc='d\r\ne'\r\n" * 10,
+        'a="b\nc\nd"\ne=f\n' * 10,
+        "a='" + "b\n" * 50 + "'\nc=d\n",
+        "a b\n  \n# c\nd=e # f\n\n" * 10,
+        "a='b\n" * 20,
+    ],
+)
+@pytest.mark.parametrize("dialect", ["full", "simple", "docker"])
+@pytest.mark.parametrize("workers", [1, 3, 7])
+def test_parse_parallel(test_input, dialect, workers):
+    expected = list(parse_string(test_input, dialect=dialect))
+
+    result = parse_parallel(test_input, workers, dialect=dialect)
+
+    assert list(result) == expected
+
+
+def test_parse_pairs_parallel():
+    test_input = "a=b\nc d\n'e'='f\ng'\n# h\ni\n" * 10
+
+    result = parse_pairs_parallel(test_input, 3)
+
+    assert list(result) == [
+        (binding.key, binding.value, binding.original.line)
+        for binding in parse_string(test_input, keys_only=True)
+    ]
+
+
+def test_parse_parallel_split_line_break():
+    # Error recovery splits the "\r\n", which is then two line breaks.
+    test_input = "=a\r\nb=1\n" + "c=2\n" * 50 + "d e\n" + "f=3\n" * 50
+
+    result = parse_pairs_parallel(test_input, 4)
+
+    assert list(result) == [
+        (binding.key, binding.value, binding.original.line)
+        for binding in parse_string(test_input, keys_only=True)
+    ]
+
+
+def test_parse_parallel_needs_workers():
+    with pytest.raises(ValueError, match="workers must be at least 1"):
+        list(parse_parallel("a=b", 0))
@@ -1,6 +1,12 @@
 import pytest
 
-from dotenv.variables import Literal, Variable, parse_variables
+from dotenv.variables import (
+    Literal,
+    Template,
+    Variable,
+    compile_template,
+    parse_variables,
+)
 
 
 @pytest.mark.parametrize(
@@ -33,3 +39,80 @@ def test_parse_variables(value, expected):
     result = parse_variables(value)
 
     assert list(result) == expected
+
+
+@pytest.mark.parametrize(
+    "value,max_depth,expected",
+    [
+        ("${a:-${b:-c}}", 8, [Variable(name="a", default="${b:-c}")]),
+        (
+            "${a:-${b:-c}}",
+            0,
+            [Variable(name="a", default="${b:-c"), Literal(value="}")],
+        ),
+        (
+            "${a:-${b:-${c}}}",
+            1,
+            [Variable(name="a", default="${b:-${c}"), Literal(value="}")],
+        ),
+        ("${a:-b:c}", 8, [Variable(name="a", default="b:c")]),
+        ("${a:-{b}}", 8, [Variable(name="a", default="{b"), Literal(value="}")]),
+        ("${a:-b", 8, [Literal(value="${a:-b")]),
+        (
+            "x${a:-${b:-${c}y",
+            8,
+            [
+                Literal(value="x${a:-${b:-"),
+                Variable(name="c", default=None),
+                Literal(value="y"),
+            ],
+        ),
+        ("${a${b:c}", 8, [Literal(value="${a${b:c}")]),
+    ],
+)
+def test_parse_variables_nested(value, max_depth, expected):
+    result = parse_variables(value, max_depth)
+
+    assert list(result) == expected
+
+
+@pytest.mark.parametrize(
+    "value,expected",
+    [
+        ("${a:-${b:-c}}", "c"),
+        ("${a:-${d:-c}}", "4"),
+        ("${a:-x${b:-${d}}y}", "x4y"),
+        ("${e:-${d}}", ""),
+    ],
+)
+def test_variable_resolve_nested(value, expected):
+    (atom,) = parse_variables(value)
+
+    assert atom.resolve({"d": "4", "e": None}) == expected
+
+
+@pytest.mark.parametrize(
+    "value,names,expected",
+    [
+        ("", (), ""),
+        ("a", (), "a"),
+        ("${a", (), "${a"),
+        ("${a}", ("a",), "1"),
+        ("x${a}-${b:-c}${d}y", ("a", "b", "d"), "x1-cy"),
+        ("${b:-${c:-${a}}}", ("b", "c", "a"), "1"),
+    ],
+)
+def test_template(value, names, expected):
+    template = Template(value)
+
+    assert template.atoms == tuple(parse_variables(value))
+    assert template.names == names
+    assert template.substitute({"a": "1", "d": None}) == expected
+
+
+def test_compile_template():
+    template = compile_template("${a}")
+
+    assert compile_template("${a}") is template
+    assert not hasattr(template, "__dict__")
+    assert not hasattr(template.atoms[0], "__dict__")
@@ -0,0 +1,153 @@
+"""
+Worst-case inputs for the parsers.
+
+.env files and values can come from untrusted sources, so parsing must take
+linear time whatever the input. Each input below targets a way the parsers
+could backtrack or rescan: it is parsed at two sizes and the larger one
+must not take much more than proportionally longer, whereas quadratic
+behavior would make the ratio of the times the square of that of the sizes.
+
+Timings depend on the machine and on what else it runs, so these checks are
+only run with `pytest --worst-case`, as the `worst-case` tox environment
+does in CI.
+"""
+
+import gc
+import io
+import time
+
+import pytest
+
+from dotenv.graph import VariableGraph
+from dotenv.main import resolve_variables
+from dotenv.parser import parse_pairs, parse_stream
+from dotenv.variables import compile_template, parse_variables
+
+pytestmark = pytest.mark.worst_case
+
+GROWTH = 4
+
+
+def best_time(function, argument):
+    # Garbage collections would take longer the more objects earlier tests
+    # left alive, and more often with the larger input.
+    gc.collect()
+    gc.disable()
+    try:
+        best = float("inf")
+        for _ in range(3):
+            start = time.perf_counter()
+            function(argument)
+            best = min(best, time.perf_counter() - start)
+        return best
+    finally:
+        gc.enable()
+
+
+def assert_linear(function, make_input):
+    # Start from a size which takes long enough to be timed reliably.
+    size = 1000
+    small = best_time(function, make_input(size))
+    while small < 0.005 and size < 1_000_000:
+        size *= 2
+        small = best_time(function, make_input(size))
+
+    large = best_time(function, make_input(GROWTH * size))
+
+    assert large < 2.5 * GROWTH * small
+
+
+def parse(string):
+    return list(parse_stream(io.StringIO(string)))
+
+
+def parse_chunked(string):
+    return list(parse_stream(io.StringIO(string), chunk_size=64))
+
+
+dotenv_inputs = [
+    pytest.param(lambda n: "a" * n + " b\n", id="long line without equals"),
+    pytest.param(lambda n: "a" + " " * n + "b=c\n", id="spaces in key"),
+    pytest.param(lambda n: "export" + " " * n + "\n", id="export without key"),
+    pytest.param(lambda n: "'" + "a" * n + "\n", id="unclosed quoted key"),
+    pytest.param(lambda n: "a=b" + " " * n + "c#\n", id="spaces before hash"),
+    pytest.param(lambda n: "a=" + "b " * (n // 2) + "#\n", id="many inline spaces"),
+    pytest.param(lambda n: "#" * n, id="hashes"),
+    pytest.param(lambda n: "'" * n, id="unmatched quotes"),
+    pytest.param(lambda n: 'a="\n' * (n // 4), id="unclosed quoted values"),
+    pytest.param(lambda n: "a='b\n" * (n // 5), id="quoted values with garbage"),
+    pytest.param(lambda n: 'a="' + '\\"' * (n // 2), id="escaped quotes"),
+    pytest.param(lambda n: "\r" * n, id="carriage returns"),
+    pytest.param(lambda n: "a b\r" * (n // 4) + "\n", id="split line breaks"),
+    pytest.param(lambda n: "a b c\n" * (n // 6), id="error recovery"),
+    pytest.param(lambda n: "a b" + " c" * (n // 2), id="long error line"),
+    pytest.param(lambda n: "a=\x0b" * (n // 3), id="vertical tabs"),
+]
+
+
+@pytest.mark.parametrize("make_input", dotenv_inputs)
+def test_parse_stream_is_linear(make_input):
+    assert_linear(parse, make_input)
+
+
+@pytest.mark.parametrize("make_input", dotenv_inputs)
+def test_parse_stream_chunked_is_linear(make_input):
+    assert_linear(parse_chunked, make_input)
+
+
+@pytest.mark.parametrize("dialect", ["simple", "docker"])
+@pytest.mark.parametrize(
+    "make_input",
+    [
+        pytest.param(lambda n: "a" * n, id="long line"),
+        pytest.param(lambda n: "a=\r" * (n // 3), id="carriage returns"),
+    ],
+)
+def test_parse_pairs_chunked_is_linear(dialect, make_input):
+    def parse(string):
+        return list(parse_pairs(io.StringIO(string), 64, dialect))
+
+    assert_linear(parse, make_input)
+
+
+@pytest.mark.parametrize(
+    "make_input",
+    [
+        pytest.param(lambda n: "${" * (n // 2), id="nested expressions"),
+        pytest.param(lambda n: "${a:-" * (n // 5), id="unclosed defaults"),
+        pytest.param(lambda n: "${a:" * (n // 4), id="colons"),
+        pytest.param(lambda n: "$" * n, id="dollars"),
+        pytest.param(lambda n: "${a}" * (n // 4), id="variables"),
+        pytest.param(lambda n: "${a:-${" * (n // 7), id="unclosed nested defaults"),
+        pytest.param(
+            lambda n: ("${a:-" * 12 + "}" * 12) * (n // 72), id="deep defaults"
+        ),
+        pytest.param(lambda n: "${a:-${b}" * (n // 9), id="closed nested"),
+    ],
+)
+def test_parse_variables_is_linear(make_input):
+    assert_linear(lambda value: list(parse_variables(value)), make_input)
+
+
+@pytest.mark.parametrize("override", [True, False])
+def test_resolve_variables_is_linear(override):
+    def make_input(n):
+        return [(f"a{i}", f"${{a{i - 1}}}b") for i in range(n // 8)]
+
+    def resolve(values):
+        # Templates cached by a previous run would make small inputs faster.
+        compile_template.cache_clear()
+        return resolve_variables(values, override)
+
+    assert_linear(resolve, make_input)
+
+
+def test_variable_graph_is_linear():
+    def make_input(n):
+        return [(f"a{i}", f"${{a{i + 1}}}b") for i in range(n // 8)]
+
+    def resolve(values):
+        compile_template.cache_clear()
+        return VariableGraph(values).resolve(True)
+
+    assert_linear(resolve, make_input)
@@ -7,6 +7,8 @@ from typing import List
 from unittest import mock
 from zipfile import ZipFile
 
+from dotenv.freeze import render_module
+
 
 def walk_to_root(path: str):
     last_dir = None
@@ -107,3 +109,43 @@ def test_load_dotenv_outside_zip_file_when_called_in_zipfile(tmp_path):
     )
 
     assert result.stdout == "x\n"
+
+
+def test_load_dotenv_frozen_module_in_zipfile(tmp_path):
+    zip_file_path = setup_zipfile(
+        tmp_path,
+        [
+            FileToAdd(
+                content=render_module({"A": "x"}, interpolated=True),
+                path="child1/frozen_env.py",
+            ),
+        ],
+    )
+    code_path = tmp_path / "code.py"
+    code_path.write_text(
+        textwrap.dedent(
+            f"""
+            import os
+            import sys
+
+            sys.path.append({str(zip_file_path)!r})
+
+            from dotenv import load_dotenv
+
+            load_dotenv(frozen="child1.frozen_env")
+
+            print(os.environ['A'])
+            """
+        )
+    )
+
+    result = subprocess.run(
+        [sys.executable, str(code_path)],
+        capture_output=True,
+        check=True,
+        cwd=tmp_path,
+        text=True,
+        env={k: v for k, v in os.environ.items() if k.upper() != "A"},
+    )
+
+    assert result.stdout == "x\n"